@@ -0,0 +1,265 @@
+# filename: ingest_books.py
+# Streams the Gutenberg books into a persistent ChromaDB collection:
+#   read -> clean -> chunk (process pool) -> batch embed (thread pool) -> upsert
+# Finished books are checkpointed, so an interrupted run resumes without
+# re-embedding anything that is already stored.
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import chromadb
+from dotenv import load_dotenv
+from openai import OpenAI, RateLimitError
+
+load_dotenv()
+
+BOOKS_DIR = "gutenberg_robot_books"
+DB_DIR = "gutenberg_chroma"
+COLLECTION_NAME = "gutenberg_robot_books"
+CHECKPOINT_FILE = "ingest_checkpoint.jsonl"
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+START_MARKER = re.compile(r"\*\*\*\s*START OF (THE|THIS) PROJECT GUTENBERG EBOOK.*?\*\*\*", re.I)
+END_MARKER = re.compile(r"\*\*\*\s*END OF (THE|THIS) PROJECT GUTENBERG EBOOK", re.I)
+
+
+# Function to strip the Gutenberg license header/footer and normalize whitespace
+def clean_text(text):
+    start = START_MARKER.search(text)
+    if start:
+        text = text[start.end():]
+    end = END_MARKER.search(text)
+    if end:
+        text = text[: end.start()]
+    text = text.replace("\r\n", "\n")
+    paragraphs = [" ".join(p.split()) for p in re.split(r"\n\s*\n", text)]
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+# Function to split text into overlapping chunks, preferring paragraph boundaries
+def chunk_text(text, chunk_size=1000, overlap=200):
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        while len(paragraph) > chunk_size:
+            # paragraph too long on its own, hard split it
+            head, paragraph = paragraph[:chunk_size], paragraph[chunk_size - overlap:]
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(head)
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            chunks.append(current)
+            current = current[-overlap:] if overlap else ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# CPU stage: runs in a worker process, returns everything needed to embed a book
+def prepare_book(path, chunk_size=1000, overlap=200):
+    with open(path, "rb") as file:
+        raw = file.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    text = clean_text(raw.decode("utf-8", errors="ignore"))
+    return {
+        "book": os.path.basename(path),
+        "hash": content_hash,
+        "chunks": chunk_text(text, chunk_size, overlap),
+    }
+
+
+# The checkpoint is a log with one {"book", "hash"} line per ingested book, later lines win
+def load_checkpoint(path=CHECKPOINT_FILE):
+    checkpoint = {}
+    if not os.path.exists(path):
+        return checkpoint
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:  # a line cut off by an interrupted run
+                continue
+            checkpoint[record["book"]] = record["hash"]
+    return checkpoint
+
+
+# Appending one line per finished book keeps checkpointing cheap for large corpora
+def append_checkpoint(file, book, book_hash):
+    file.write(json.dumps({"book": book, "hash": book_hash}) + "\n")
+    file.flush()
+
+
+# Rewrite the log without superseded lines once per run, through a temp file so
+# a crash never leaves it half written
+def save_checkpoint(checkpoint, path=CHECKPOINT_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        for book, book_hash in checkpoint.items():
+            append_checkpoint(file, book, book_hash)
+    os.replace(tmp_path, path)
+
+
+# I/O stage: one embeddings request for a whole batch, with backoff on 429s
+def embed_batch(client, texts, model=EMBEDDING_MODEL, max_retries=5):
+    for attempt in range(max_retries):
+        try:
+            response = client.embeddings.create(input=texts, model=model)
+            return [item.embedding for item in response.data]
+        except RateLimitError:
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(2**attempt)
+
+
+def ingest(
+    books_dir=BOOKS_DIR,
+    db_dir=DB_DIR,
+    checkpoint_path=CHECKPOINT_FILE,
+    batch_size=64,
+    max_workers=None,
+    max_concurrent_requests=4,
+    max_prepared_books=None,
+    chunk_size=1000,
+    overlap=200,
+):
+    """
+    Ingests every book in books_dir into a persistent ChromaDB collection.
+
+    :param batch_size: int, number of chunks sent in one embeddings request.
+    :param max_workers: int, processes used to read, clean and chunk books.
+    :param max_concurrent_requests: int, embeddings requests kept in flight.
+    :param max_prepared_books: int, books read and chunked ahead of the
+        embedding stage, twice the number of processes by default.
+    """
+    client = OpenAI()
+    collection = chromadb.PersistentClient(path=db_dir).get_or_create_collection(
+        name=COLLECTION_NAME
+    )
+    checkpoint = load_checkpoint(checkpoint_path)
+    save_checkpoint(checkpoint, checkpoint_path)
+    checkpoint_file = open(checkpoint_path, "a", encoding="utf-8")
+    if max_prepared_books is None:
+        max_prepared_books = 2 * (max_workers or os.cpu_count() or 1)
+
+    paths = sorted(
+        os.path.join(books_dir, name)
+        for name in os.listdir(books_dir)
+        if name.endswith(".txt")
+    )
+
+    pending_chunks = {}  # book -> chunks not yet upserted
+    book_hashes = {}
+    batch = []  # (book, index, text) waiting to be embedded
+    in_flight = {}  # embed future -> batch
+    skipped = ingested = 0
+
+    def submit_batch(embed_pool):
+        nonlocal batch
+        future = embed_pool.submit(embed_batch, client, [text for _, _, text in batch])
+        in_flight[future] = batch
+        batch = []
+
+    def drain(block):
+        nonlocal ingested
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            items = in_flight.pop(future)
+            collection.upsert(
+                ids=[f"{book}-{index}" for book, index, _ in items],
+                embeddings=future.result(),
+                documents=[text for _, _, text in items],
+                metadatas=[{"book": book, "chunk": index} for book, index, _ in items],
+            )
+            for book, _, _ in items:
+                pending_chunks[book] -= 1
+                if pending_chunks[book] == 0:
+                    # every chunk of this book is stored, safe to checkpoint
+                    del pending_chunks[book]
+                    checkpoint[book] = book_hashes.pop(book)
+                    append_checkpoint(checkpoint_file, book, checkpoint[book])
+                    ingested += 1
+                    print(f"Ingested {book}")
+
+    with checkpoint_file, ProcessPoolExecutor(
+        max_workers=max_workers
+    ) as cpu_pool, ThreadPoolExecutor(max_workers=max_concurrent_requests) as embed_pool:
+        # only a bounded window of books is prepared ahead, so memory does not
+        # grow with the corpus while the embedding stage catches up
+        remaining_paths = iter(paths)
+        preparing = set()
+
+        def prepare_next():
+            path = next(remaining_paths, None)
+            if path is not None:
+                preparing.add(cpu_pool.submit(prepare_book, path, chunk_size, overlap))
+
+        for _ in range(max_prepared_books):
+            prepare_next()
+
+        while preparing:
+            finished, _ = wait(preparing, return_when=FIRST_COMPLETED)
+            future = finished.pop()
+            preparing.discard(future)
+            prepared = future.result()
+            prepare_next()
+            book = prepared["book"]
+            if checkpoint.get(book) == prepared["hash"] or not prepared["chunks"]:
+                skipped += 1
+                continue
+
+            # drop chunks left over from an older version of the same book
+            collection.delete(where={"book": book})
+            pending_chunks[book] = len(prepared["chunks"])
+            book_hashes[book] = prepared["hash"]
+            for index, text in enumerate(prepared["chunks"]):
+                batch.append((book, index, text))
+                if len(batch) >= batch_size:
+                    # keep a bounded number of requests in flight
+                    while len(in_flight) >= max_concurrent_requests:
+                        drain(block=True)
+                    submit_batch(embed_pool)
+            drain(block=False)
+
+        if batch:
+            submit_batch(embed_pool)
+        while in_flight:
+            drain(block=True)
+
+    print(f"Done: {ingested} books ingested, {skipped} unchanged books skipped.")
+    return collection
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest Gutenberg books into ChromaDB")
+    parser.add_argument("--books-dir", default=BOOKS_DIR)
+    parser.add_argument("--db-dir", default=DB_DIR)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    ingest(
+        books_dir=args.books_dir,
+        db_dir=args.db_dir,
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        max_concurrent_requests=args.concurrency,
+    )
+
+
+if __name__ == "__main__":
+    main()
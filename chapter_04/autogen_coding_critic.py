@@ -1,23 +1,35 @@
 from autogen import AssistantAgent, UserProxyAgent, config_list_from_json
 
+from cached_executor import CachingCodeExecutor
+from config_balancer import balance_agents
+from parallel_review import ConcurrentReviews
+from warm_executor import WarmPoolCodeExecutor
+
 # Load the configuration list from the config file.
 config_list = config_list_from_json(env_or_file="OAI_CONFIG_LIST")
 
+# Run code blocks on a pool of warm Python interpreters instead of a fresh process each time,
+# and reuse the previous result when a block and its input files are unchanged.
+executor = CachingCodeExecutor(
+    WarmPoolCodeExecutor(work_dir="working", pool_size=2, timeout=60),
+    force=False,
+)
+
 # Create the agent that represents the user in the conversation.
 user_proxy = UserProxyAgent(
     "user",
     code_execution_config={
-        "work_dir": "working",
-        "use_docker": False,
+        "executor": executor,
         "last_n_messages": 1,
     },
     human_input_mode="ALWAYS",
     is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
 )
 
+# Stream the engineer's tokens to the console as they arrive, the chat still gets the whole reply.
 engineer = AssistantAgent(
     name="Engineer",
-    llm_config={"config_list": config_list},
+    llm_config={"config_list": config_list, "stream": True},
     system_message="""
     You are a profession Python engineer, known for your expertise in software development.
     You use your skills to create software applications, tools, and games that are both functional and efficient.
@@ -25,17 +37,40 @@ engineer = AssistantAgent(
     """,
 )
 
-critic = AssistantAgent(
-    name="Reviewer",
+security_reviewer = AssistantAgent(
+    name="Security_Reviewer",
     llm_config={"config_list": config_list},
     system_message="""
-    You are a code reviewer, known for your thoroughness and commitment to standards.
-    Your task is to scrutinize code content for any harmful or substandard elements.
-    You ensure that the code is secure, efficient, and adheres to best practices.
-    You will identify any issues or areas for improvement in the code and output them as a list.
+    You are a security focused code reviewer, known for your thoroughness and commitment to standards.
+    Your task is to scrutinize code content for any harmful or unsafe elements.
+    You will identify any security issues in the code and output them as a list.
     """,
 )
 
+performance_reviewer = AssistantAgent(
+    name="Performance_Reviewer",
+    llm_config={"config_list": config_list},
+    system_message="""
+    You are a performance focused code reviewer, known for your thoroughness and commitment to standards.
+    Your task is to scrutinize code content for inefficient algorithms, wasted work and resource leaks.
+    You will identify any performance issues in the code and output them as a list.
+    """,
+)
+
+style_reviewer = AssistantAgent(
+    name="Style_Reviewer",
+    llm_config={"config_list": config_list},
+    system_message="""
+    You are a code reviewer focused on style, known for your thoroughness and commitment to standards.
+    Your task is to make sure the code is readable, well-structured and adheres to best practices.
+    You will identify any style issues or areas for improvement in the code and output them as a list.
+    """,
+)
+
+# Spread the agents' requests over all OAI_CONFIG_LIST entries by latency, errors and 429s,
+# so the concurrent reviewers do not all queue up on the first deployment.
+balancer = balance_agents([engineer, security_reviewer, performance_reviewer, style_reviewer])
+
 
 def review_code(recipient, messages, sender, config):
     return f"""
@@ -45,16 +80,19 @@ def review_code(recipient, messages, sender, config):
             """
 
 
+# The reviewers run at the same time and their findings are merged into one reply.
 user_proxy.register_nested_chats(
     [
         {
-            "recipient": critic,
+            "recipient": reviewer,
             "message": review_code,
             "summary_method": "last_msg",
-            "max_turns": 3,
+            "max_turns": 1,
         }
+        for reviewer in [security_reviewer, performance_reviewer, style_reviewer]
     ],
     trigger=engineer,  # condition=my_condition,
+    reply_func_from_nested_chats=ConcurrentReviews(),
 )
 
 task = """Write a snake game using Pygame."""
@@ -62,3 +100,4 @@ task = """Write a snake game using Pygame."""
 res = user_proxy.initiate_chat(
     recipient=engineer, message=task, max_turns=2, summary_method="last_msg"
 )
+print(balancer.report())
@@ -1,5 +1,6 @@
 from autogen import AssistantAgent, UserProxyAgent, config_list_from_json
-from autogen.cache import Cache
+
+from semantic_cache import SemanticCache
 
 # Load the configuration list from the config file.
 config_list = config_list_from_json(env_or_file="OAI_CONFIG_LIST")
@@ -16,9 +17,10 @@ user_proxy = UserProxyAgent(
     is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
 )
 
+# Stream the engineer's tokens to the console as they arrive, the chat still gets the whole reply.
 engineer = AssistantAgent(
     name="Engineer",
-    llm_config={"config_list": config_list},
+    llm_config={"config_list": config_list, "stream": True},
     system_message="""
     You are a profession Python engineer, known for your expertise in software development.
     You use your skills to create software applications, tools, and games that are both functional and efficient.
@@ -28,7 +30,7 @@ engineer = AssistantAgent(
 
 critic = AssistantAgent(
     name="Reviewer",
-    llm_config={"config_list": config_list},
+    llm_config={"config_list": config_list, "stream": True},
     system_message="""
     You are a code reviewer, known for your thoroughness and commitment to standards.
     Your task is to scrutinize code content for any harmful or substandard elements.
@@ -60,7 +62,14 @@ user_proxy.register_nested_chats(
 
 task = """Write a snake game using Pygame."""
 
-with Cache.disk(cache_seed=42) as cache:
+# Exact hits behave like Cache.disk, reworded tasks reuse the closest cached turn.
+# Capped at 500 entries, hit/miss/latency-saved counters per agent go to cache_metrics.json
+cache = SemanticCache(
+    threshold=0.92, max_entries=500, policy="lru", metrics_path="cache_metrics.json"
+)
+cache.register_agents([engineer, critic])
+
+with cache:
     res = user_proxy.initiate_chat(
         recipient=engineer,
         message=task,
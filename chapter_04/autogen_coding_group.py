@@ -5,17 +5,28 @@ from autogen import (
     UserProxyAgent,
     config_list_from_json,
 )
-from autogen.cache import Cache
+
+from cached_executor import CachingCodeExecutor
+from history_policy import add_history_policy
+from semantic_cache import SemanticCache
+from speaker_rules import coding_group_rules
+from warm_executor import WarmPoolCodeExecutor
 
 # Load the configuration list from the config file.
 config_list = config_list_from_json(env_or_file="OAI_CONFIG_LIST")
 
+# Run code blocks on a pool of warm Python interpreters instead of a fresh process each time,
+# and reuse the previous result when a block and its input files are unchanged.
+executor = CachingCodeExecutor(
+    WarmPoolCodeExecutor(work_dir="working", pool_size=2, timeout=60),
+    force=False,
+)
+
 # Create the agent that represents the user in the conversation.
 user_proxy = UserProxyAgent(
     "user",
     code_execution_config={
-        "work_dir": "working",
-        "use_docker": False,
+        "executor": executor,
         "last_n_messages": 3,
     },
     human_input_mode="NEVER",
@@ -23,9 +34,11 @@ user_proxy = UserProxyAgent(
 
 llm_config = {"config_list": config_list}
 
+# Stream the engineer's tokens to the console as they arrive, the chat still gets the whole reply.
+# The manager keeps the plain config, its speaker selection replies are not worth showing.
 engineer = AssistantAgent(
     name="Engineer",
-    llm_config=llm_config,
+    llm_config={**llm_config, "stream": True},
     system_message="""
     You are a profession Python engineer, known for your expertise in software development.
     You use your skills to create software applications, tools, and games that are both functional and efficient.
@@ -50,12 +63,22 @@ critic = AssistantAgent(
     """,
 )
 
-groupchat = GroupChat(agents=[user_proxy, engineer, critic], messages=[], max_round=20)
+# Keep only the latest code, summarize older critiques and cap each agent's prompt size.
+add_history_policy([engineer, critic], max_tokens=6000, critic_names=[critic.name])
+
+# Pick the next speaker locally when the rule table is unambiguous, otherwise ask the LLM.
+groupchat = GroupChat(
+    agents=[user_proxy, engineer, critic],
+    messages=[],
+    max_round=20,
+    speaker_selection_method=coding_group_rules(user_proxy, engineer, critic),
+)
 manager = GroupChatManager(groupchat=groupchat, llm_config=llm_config)
 
 task = """Write a snake game using Pygame."""
 
-with Cache.disk(cache_seed=43) as cache:
+# Exact hits behave like Cache.disk, reworded tasks reuse the closest cached turn.
+with SemanticCache(threshold=0.92) as cache:
     res = user_proxy.initiate_chat(
         recipient=manager,
         message=task,
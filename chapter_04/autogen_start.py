@@ -3,8 +3,8 @@ from autogen import ConversableAgent, UserProxyAgent, config_list_from_json
 # Load the configuration list from the config file.
 config_list = config_list_from_json(env_or_file="OAI_CONFIG_LIST")
 
-# Create the agent that uses the LLM.
-assistant = ConversableAgent("agent", llm_config={"config_list": config_list})
+# Create the agent that uses the LLM, its reply is printed token by token as it streams in.
+assistant = ConversableAgent("agent", llm_config={"config_list": config_list, "stream": True})
 
 # Create the agent that represents the user in the conversation.
 user_proxy = UserProxyAgent(
@@ -0,0 +1,269 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+class BoundedCache:
+    """
+    A size-bounded AutoGen cache backend with LRU or LFU eviction and
+    per-agent hit/miss/latency-saved counters.
+
+    Use it anywhere a `Cache.disk(...)` object is accepted:
+
+        cache = BoundedCache(max_entries=500, policy="lfu")
+        cache.register_agents([engineer, critic])
+        with cache:
+            user_proxy.initiate_chat(engineer, message=task, cache=cache)
+
+    Requests are attributed to an agent by their system message, so agents
+    must be registered for the per-agent counters to be meaningful. The
+    counters are written to `metrics_path` as JSON whenever they change.
+
+    Subclasses can add columns to the entries table and answer a miss with
+    a similar entry (see SemanticCache), the eviction and counters apply to
+    them as well.
+    """
+
+    POLICIES = {
+        "lru": "last_access ASC",
+        "lfu": "hits ASC, last_access ASC",
+    }
+    # extra column definitions and indexes of the entries table, for subclasses
+    EXTRA_COLUMNS = ()
+    INDEXES = ()
+
+    def __init__(
+        self,
+        path=".cache/bounded_cache.db",
+        max_entries=1000,
+        max_bytes=256 * 1024 * 1024,
+        policy="lru",
+        metrics_path="cache_metrics.json",
+    ):
+        """
+        :param path: str, the SQLite file used to store the cache.
+        :param max_entries: int, maximum number of cached responses (None for no cap).
+        :param max_bytes: int, maximum total size of cached responses (None for no cap).
+        :param policy: str, "lru" or "lfu".
+        :param metrics_path: str, the JSON file the counters are exported to (None to not export).
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {list(self.POLICIES)}, got {policy!r}")
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.metrics_path = metrics_path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._agents = {}  # system message -> agent name
+        self._misses = {}  # key -> (time of the miss, what _find_similar computed)
+        self._metrics = {"agents": {}, "evictions": 0}
+        self._dirty = False
+        self._load_metrics()
+
+    def _load_metrics(self):
+        # keep counting from the previous runs so the numbers cover the cache lifetime
+        if not self.metrics_path or not os.path.exists(self.metrics_path):
+            return
+        with open(self.metrics_path, "r", encoding="utf-8") as file:
+            saved = json.load(file)
+        self._metrics["evictions"] = saved.get("evictions", 0)
+        for agent, counters in saved.get("agents", {}).items():
+            self._metrics["agents"][agent] = {
+                "hits": counters.get("hits", 0),
+                "misses": counters.get("misses", 0),
+                "latency_saved": counters.get("latency_saved", 0.0),
+            }
+
+    def register_agents(self, agents):
+        """Register agents so their requests can be attributed to them."""
+        for agent in agents:
+            self._agents[agent.system_message] = agent.name
+
+    def _connect(self):
+        # AutoGen closes the cache after every request, so reopen lazily
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            columns = ",\n".join(
+                (
+                    "key TEXT PRIMARY KEY",
+                    "value BLOB NOT NULL",
+                    "size INTEGER NOT NULL",
+                    "hits INTEGER NOT NULL DEFAULT 0",
+                    "last_access REAL NOT NULL",
+                    "latency REAL NOT NULL DEFAULT 0",
+                    *self.EXTRA_COLUMNS,
+                )
+            )
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS entries ({columns})")
+            for index in self.INDEXES:
+                self._conn.execute(index)
+        return self._conn
+
+    def _find_similar(self, conn, key):
+        """
+        Called on a miss of `key`. Returns the key of an entry that can answer
+        the request instead (or None), and what was computed for `key`, which
+        is handed back to _entry_columns() when the response is set.
+        """
+        return None, None
+
+    def _entry_columns(self, key, info):
+        """Values of the EXTRA_COLUMNS for a new entry, as a dict."""
+        return {}
+
+    def _forget(self, keys):
+        """Called with the keys of evicted entries."""
+
+    def _agent_for(self, key):
+        try:
+            messages = json.loads(key).get("messages") or []
+        except (TypeError, ValueError, AttributeError):
+            return "unknown"
+        for message in messages:
+            if message.get("role") == "system":
+                return self._agents.get(message.get("content"), "unknown")
+        return "unknown"
+
+    def _counters(self, agent):
+        return self._metrics["agents"].setdefault(
+            agent, {"hits": 0, "misses": 0, "latency_saved": 0.0}
+        )
+
+    def get(self, key, default=None):
+        with self._lock:
+            conn = self._connect()
+            agent = self._agent_for(key)
+            hit_key, info = key, None
+            row = conn.execute(
+                "SELECT value, latency FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                started = time.perf_counter()
+                hit_key, info = self._find_similar(conn, key)
+                if hit_key is not None:
+                    row = conn.execute(
+                        "SELECT value, latency FROM entries WHERE key = ?", (hit_key,)
+                    ).fetchone()
+            self._dirty = True
+            if row is None:
+                self._counters(agent)["misses"] += 1
+                self._misses[key] = (started, info)
+                if len(self._misses) > 100:
+                    # a miss that never got a set() (e.g. the request failed)
+                    self._misses.pop(next(iter(self._misses)))
+                return default
+            conn.execute(
+                "UPDATE entries SET hits = hits + 1, last_access = ? WHERE key = ?",
+                (time.time(), hit_key),
+            )
+            conn.commit()
+            counters = self._counters(agent)
+            counters["hits"] += 1
+            counters["latency_saved"] += row[1]
+            return pickle.loads(row[0])
+
+    def set(self, key, value):
+        with self._lock:
+            conn = self._connect()
+            # the time between a miss and its set() is what the request cost
+            latency, info = 0.0, None
+            if key in self._misses:
+                started, info = self._misses.pop(key)
+                latency = time.perf_counter() - started
+            extra = self._entry_columns(key, info)
+            data = pickle.dumps(value)
+            columns = ["key", "value", "size", "last_access", "latency", *extra]
+            updates = "".join(f", {name} = excluded.{name}" for name in extra)
+            conn.execute(
+                f"""INSERT INTO entries ({', '.join(columns)})
+                VALUES ({', '.join('?' * len(columns))})
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value,
+                    size = excluded.size,
+                    last_access = excluded.last_access,
+                    latency = MAX(latency, excluded.latency){updates}""",
+                (key, data, len(data), time.time(), latency, *extra.values()),
+            )
+            self._evict(conn, keep=key)
+            conn.commit()
+
+    def _evict(self, conn, keep):
+        """Evicts entries over the caps, never `keep`, the entry just written."""
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        order = self.POLICIES[self.policy]
+        evicted = []
+        while (self.max_entries is not None and count > self.max_entries) or (
+            self.max_bytes is not None and size > self.max_bytes and count > 1
+        ):
+            row = conn.execute(
+                f"SELECT key, size FROM entries WHERE key != ? ORDER BY {order} LIMIT 1",
+                (keep,),
+            ).fetchone()
+            if row is None:
+                break
+            key, entry_size = row
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            evicted.append(key)
+            count -= 1
+            size -= entry_size
+            self._metrics["evictions"] += 1
+            self._dirty = True
+        if evicted:
+            if self.policy == "lfu":
+                # age the counts, so entries that were popular long ago (the
+                # counts persist across runs) make room for newer ones
+                conn.execute("UPDATE entries SET hits = hits / 2")
+            self._forget(evicted)
+
+    def metrics(self):
+        """Return the counters together with the current cache size."""
+        conn = self._connect()
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        agents = {}
+        for agent, counters in self._metrics["agents"].items():
+            total = counters["hits"] + counters["misses"]
+            agents[agent] = {
+                **counters,
+                "hit_rate": counters["hits"] / total if total else 0.0,
+            }
+        return {
+            "policy": self.policy,
+            "entries": count,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self._metrics["evictions"],
+            "agents": agents,
+        }
+
+    def export_metrics(self):
+        """Write the counters to metrics_path."""
+        tmp_path = f"{self.metrics_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.metrics(), file, indent=2)
+        os.replace(tmp_path, self.metrics_path)
+        self._dirty = False
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                if self._dirty and self.metrics_path:
+                    self.export_metrics()
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
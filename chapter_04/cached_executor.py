@@ -0,0 +1,151 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from autogen.coding.base import CommandLineCodeResult
+
+from warm_executor import code_filename
+
+IMPORT_PATTERN = re.compile(r"^\s*(?:from\s+(\w+)|import\s+([\w., ]+))", re.MULTILINE)
+
+
+def _imported_names(text):
+    """Top-level names of the modules imported by the code."""
+    names = set()
+    for from_name, import_names in IMPORT_PATTERN.findall(text):
+        if from_name:
+            names.add(from_name)
+        for name in import_names.split(","):
+            name = name.strip().split(" ")[0]
+            if name:
+                names.add(name.split(".")[0])
+    return names
+
+
+class CachingCodeExecutor:
+    """
+    Wraps an AutoGen code executor and skips blocks that already ran unchanged.
+
+    The fingerprint of a request covers the language and code of every block
+    plus the content of the work dir files the code mentions by name, so an
+    edited input file still triggers a fresh run. When the code imports a
+    module that lives in the work dir, every `.py` file there is an input,
+    since local modules can import each other. Only successful results
+    (exit code 0 and the combined stdout/stderr) are kept, so a failure is
+    retried after e.g. a pip install. They are kept in memory for the life
+    of the executor only, a new chat runs everything once again. On a reuse
+    the blocks are still written to the files they name, so the work dir
+    matches the code just as after a real run.
+
+        executor = CachingCodeExecutor(WarmPoolCodeExecutor(work_dir="working"))
+
+    Set `force = True` (or pass `force=True` to `execute_code_blocks`) to
+    always re-execute.
+    """
+
+    def __init__(self, executor, force=False):
+        """
+        :param executor: the AutoGen code executor that actually runs the code.
+        :param force: bool, re-execute even when the fingerprint is unchanged.
+        """
+        self._executor = executor
+        self._work_dir = Path(getattr(executor, "work_dir", "."))
+        self.force = force
+        self._results = {}
+
+    @property
+    def code_extractor(self):
+        return self._executor.code_extractor
+
+    @property
+    def work_dir(self):
+        return self._work_dir
+
+    def _write_named_files(self, code_blocks):
+        """Save the blocks to the files they name, as the executor would have."""
+        work_dir = self._work_dir.resolve()
+        for block in code_blocks:
+            filename = code_filename(block.code)
+            if filename is None:
+                continue
+            path = (work_dir / filename).resolve()
+            if work_dir in path.parents:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(block.code, encoding="utf-8")
+
+    def _input_files(self, code_blocks):
+        """Files in the work dir that the code refers to, minus the files the
+        blocks themselves are saved to."""
+        text = "\n".join(block.code for block in code_blocks)
+        own_files = set()
+        for block in code_blocks:
+            filename = code_filename(block.code)
+            if filename:
+                own_files.add(os.path.normpath(filename))
+
+        work_files = []
+        for root, dirs, names in os.walk(self._work_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in names:
+                path = Path(root) / name
+                work_files.append((os.path.normpath(path.relative_to(self._work_dir)), path))
+        # importing a local module makes every local module an input,
+        # since it can import the others
+        local_modules = {
+            Path(relative).parts[0].removesuffix(".py")
+            for relative, path in work_files
+            if path.suffix == ".py"
+        }
+        import_local = bool(_imported_names(text) & local_modules)
+
+        files = []
+        for relative, path in work_files:
+            if relative in own_files:
+                continue
+            if relative in text or path.name in text or (import_local and path.suffix == ".py"):
+                files.append((relative, path))
+        return sorted(files)
+
+    def fingerprint(self, code_blocks):
+        """Hash of the code blocks together with their input files."""
+        digest = hashlib.sha256()
+        for block in code_blocks:
+            digest.update(block.language.lower().encode())
+            digest.update(b"\0")
+            digest.update(block.code.encode())
+            digest.update(b"\0")
+        for relative, path in self._input_files(code_blocks):
+            digest.update(relative.encode())
+            digest.update(b"\0")
+            with path.open("rb") as file:
+                for data in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(data)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def execute_code_blocks(self, code_blocks, force=None):
+        force = self.force if force is None else force
+        key = self.fingerprint(code_blocks)
+        if not force and key in self._results:
+            print(">>>>>>>> CODE UNCHANGED, REUSING THE PREVIOUS RESULT", flush=True)
+            self._write_named_files(code_blocks)
+            return CommandLineCodeResult(**self._results[key])
+
+        result = self._executor.execute_code_blocks(code_blocks)
+        if result.exit_code != 0:
+            # a failure may go away without a code change (pip install, network)
+            return result
+        self._results[key] = {
+            "exit_code": result.exit_code,
+            "output": result.output,
+            "code_file": getattr(result, "code_file", None),
+        }
+        return result
+
+    def clear(self):
+        """Forget all cached results."""
+        self._results = {}
+
+    def restart(self):
+        self._executor.restart()
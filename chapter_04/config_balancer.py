@@ -0,0 +1,222 @@
+import copy
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from autogen import OpenAIWrapper
+from openai import APIError, RateLimitError
+
+
+class EndpointHealth:
+    """Rolling health of one config entry, shared by every agent that uses it."""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.latency = None  # EWMA of successful call latency in seconds
+        self.error_rate = 0.0  # EWMA of failed calls
+        self.cooldown_until = 0.0
+        self.throttled = 0  # consecutive 429 responses
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+
+    def weight(self, default_latency, now):
+        if now < self.cooldown_until:
+            return 0.0
+        latency = self.latency or default_latency
+        return (1.0 - self.error_rate) ** 2 / latency / (1 + self.in_flight)
+
+
+def _retry_after(error):
+    """Seconds to wait according to the Retry-After headers of a 429, or None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return float(value)
+            except ValueError:
+                return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class ConfigBalancer:
+    """
+    Keeps the health of every OAI_CONFIG_LIST entry and decides in which
+    order a request tries them.
+
+    Entries are picked at random, weighted by their rolling latency, error
+    rate and the number of requests already in flight, so traffic spreads
+    over all healthy deployments instead of always hitting the first one.
+    An entry that answered 429 sits out for its Retry-After time (or an
+    exponential backoff) and is only tried when every other entry failed.
+    """
+
+    def __init__(self, default_latency=5.0, max_cooldown=60.0):
+        """
+        :param default_latency: float, seconds assumed for entries without a successful call yet.
+        :param max_cooldown: float, longest time an entry sits out after a 429.
+        """
+        self.default_latency = default_latency
+        self.max_cooldown = max_cooldown
+        self._health = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(config):
+        """Entries are the same deployment when endpoint, type, version and model match."""
+        return (
+            config.get("base_url"),
+            config.get("api_type"),
+            config.get("api_version"),
+            config.get("model"),
+        )
+
+    def health(self, config):
+        with self._lock:
+            return self._health.setdefault(self.key(config), EndpointHealth())
+
+    def order(self, configs):
+        """Indexes of `configs` in the order a request should try them."""
+        now = time.time()
+        with self._lock:
+            health = [self._health.setdefault(self.key(c), EndpointHealth()) for c in configs]
+            latencies = [h.latency for h in health if h.latency]
+            default_latency = sum(latencies) / len(latencies) if latencies else self.default_latency
+            weights = [h.weight(default_latency, now) for h in health]
+        # weighted sampling without replacement (Efraimidis-Spirakis)
+        ready = sorted(
+            (i for i, w in enumerate(weights) if w > 0),
+            key=lambda i: random.random() ** (1.0 / weights[i]),
+            reverse=True,
+        )
+        cooling = sorted(
+            (i for i, w in enumerate(weights) if w <= 0),
+            key=lambda i: health[i].cooldown_until,
+        )
+        return ready + cooling
+
+    def started(self, config):
+        health = self.health(config)
+        with self._lock:
+            health.in_flight += 1
+
+    def succeeded(self, config, latency=None):
+        health = self.health(config)
+        with self._lock:
+            health.in_flight -= 1
+            health.calls += 1
+            health.throttled = 0
+            health.error_rate *= 1 - health.alpha
+            if latency is not None:
+                health.latency = (
+                    latency
+                    if health.latency is None
+                    else health.alpha * latency + (1 - health.alpha) * health.latency
+                )
+
+    def failed(self, config, error):
+        health = self.health(config)
+        with self._lock:
+            health.in_flight -= 1
+            health.calls += 1
+            health.errors += 1
+            health.error_rate = health.alpha + (1 - health.alpha) * health.error_rate
+            if isinstance(error, RateLimitError):
+                health.throttled += 1
+                wait = _retry_after(error)
+                if wait is None:
+                    wait = 2**health.throttled
+                health.cooldown_until = time.time() + min(max(wait, 0.0), self.max_cooldown)
+
+    def report(self):
+        """One line per entry: calls, errors, latency and cooldown."""
+        now = time.time()
+        lines = []
+        with self._lock:
+            for (base_url, _, _, model), h in self._health.items():
+                latency = f"{h.latency:.2f}s" if h.latency else "-"
+                cooldown = max(0.0, h.cooldown_until - now)
+                lines.append(
+                    f"{model} @ {base_url or 'openai'}: {h.calls} calls, {h.errors} errors, "
+                    f"latency {latency}, error rate {h.error_rate:.2f}, cooldown {cooldown:.0f}s"
+                )
+        return "\n".join(lines)
+
+
+# shared by all agents in the process unless they are given their own
+default_balancer = ConfigBalancer()
+
+
+class BalancedOpenAIWrapper(OpenAIWrapper):
+    """
+    An OpenAIWrapper that spreads requests over its config list using a
+    ConfigBalancer, instead of always starting with the first entry.
+
+    Each entry gets its own single-entry wrapper, so caching, streaming and
+    cost accounting work as usual. With more than one entry the OpenAI SDK
+    retries are turned off (unless `max_retries` is set): a failed request
+    moves on to the next entry right away instead of retrying the same one.
+    """
+
+    def __init__(self, *, config_list=None, balancer=None, **base_config):
+        super().__init__(config_list=config_list, **base_config)
+        self.balancer = balancer or default_balancer
+        configs = [dict(config) for config in (config_list or [base_config])]
+        if len(configs) > 1:
+            for config in configs:
+                config.setdefault("max_retries", 0)
+        self._entries = [
+            (config, OpenAIWrapper(config_list=[config], **base_config)) for config in configs
+        ]
+
+    def create(self, **config):
+        order = self.balancer.order([entry_config for entry_config, _ in self._entries])
+        for position, i in enumerate(order):
+            entry_config, wrapper = self._entries[i]
+            before = copy.deepcopy(wrapper.actual_usage_summary)
+            self.balancer.started(entry_config)
+            start = time.perf_counter()
+            try:
+                response = wrapper.create(**config)
+            except (APIError, TimeoutError) as err:
+                self.balancer.failed(entry_config, err)
+                if getattr(err, "code", None) == "content_filter" or position == len(order) - 1:
+                    raise
+                continue
+            except Exception as err:
+                self.balancer.failed(entry_config, err)
+                raise
+
+            # cache hits do not say anything about the endpoint
+            cached = wrapper.actual_usage_summary == before
+            self.balancer.succeeded(
+                entry_config, None if cached else time.perf_counter() - start
+            )
+            usage = wrapper._clients[0].get_usage(response)
+            self._update_usage(actual_usage=None if cached else usage, total_usage=usage)
+            response.config_id = i
+            return response
+        raise RuntimeError("The config list is empty.")
+
+
+def balance_agents(agents, balancer=None):
+    """
+    Replaces the LLM client of each agent with a BalancedOpenAIWrapper built
+    from its own llm_config, sharing one balancer between all of them.
+
+    :param agents: list of ConversableAgent.
+    :param balancer: ConfigBalancer, defaults to the process wide one.
+    :return: ConfigBalancer, the balancer used.
+    """
+    balancer = balancer or default_balancer
+    for agent in agents:
+        if agent.llm_config:
+            agent.client = BalancedOpenAIWrapper(balancer=balancer, **agent.llm_config)
+    return balancer
@@ -0,0 +1,478 @@
+import functools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+DELEGATION_TOOLS = ("Delegate work to co-worker", "Ask question to co-worker")
+
+
+class _LLMCallbacks(BaseCallbackHandler):
+    """Times every LLM call and reads its token usage."""
+
+    def __init__(self, tracer):
+        self._tracer = tracer
+        self._starts = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._starts[run_id] = time.time_ns()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._starts[run_id] = time.time_ns()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        llm_output = response.llm_output or {}
+        self._tracer._llm_call(
+            self._starts.pop(run_id, None),
+            llm_output.get("model_name", "llm"),
+            llm_output.get("token_usage") or {},
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._tracer._llm_call(self._starts.pop(run_id, None), "llm", {}, error=error)
+
+
+class LocalTracer:
+    """
+    Records what a crew does as spans and writes them to a local file:
+    a SQLite database (`.db`) or OTLP-JSON lines (`.json`/`.jsonl`) that any
+    OpenTelemetry tool can read. Nothing is sent over the network.
+
+        tracer = LocalTracer("crew_traces.db")
+        with tracer.trace(crew):
+            result = crew.kickoff()
+        print(tracer.summary())
+
+    Span kinds: `crew` (the whole run), `task`, `delegation` (work an agent
+    was asked to do by a co-worker), `llm` (with latency and tokens), `tool`
+    and `event` (see `event()`). Spans are buffered in memory and written
+    once the run ends.
+    """
+
+    def __init__(self, path="crew_traces.db", service_name="crew"):
+        """
+        :param path: str, where spans are written, the extension picks the format.
+        :param service_name: str, the OTLP service.name resource attribute.
+        """
+        self.path = path
+        self.format = "sqlite" if path.endswith((".db", ".sqlite")) else "otlp-json"
+        self.service_name = service_name
+        self.trace_id = None
+        self._root_id = None
+        self._spans = []
+        self._finished = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._callbacks = _LLMCallbacks(self)
+        self._instrumented = set()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _record(self, kind, name, agent, start_ns, end_ns, attributes, parent_id=None):
+        current = self._current()
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": os.urandom(8).hex(),
+            "parent_id": parent_id or (current["span_id"] if current else self._root_id),
+            "kind": kind,
+            "name": name,
+            "agent": agent,
+            "start_ns": start_ns,
+            "end_ns": end_ns,
+            "attributes": attributes,
+        }
+        with self._lock:
+            self._spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, kind, name, agent=None, **attributes):
+        """Times the block as a span; the yielded dict takes extra attributes."""
+        current = self._current()
+        span = {
+            "span_id": os.urandom(8).hex(),
+            "parent_id": current["span_id"] if current else self._root_id,
+            "agent": agent or (current["agent"] if current else None),
+        }
+        stack = self._stack()
+        stack.append(span)
+        start_ns = time.time_ns()
+        try:
+            yield attributes
+        except BaseException as error:
+            attributes["error"] = repr(error)
+            raise
+        finally:
+            stack.pop()
+            end_ns = time.time_ns()
+            with self._lock:
+                self._spans.append(
+                    {
+                        "trace_id": self.trace_id,
+                        **span,
+                        "kind": kind,
+                        "name": name,
+                        "start_ns": start_ns,
+                        "end_ns": end_ns,
+                        "attributes": attributes,
+                    }
+                )
+
+    def event(self, name, **attributes):
+        """Records a point in time, attributed to the agent currently working."""
+        current = self._current()
+        now = time.time_ns()
+        return self._record(
+            "event", name, current["agent"] if current else None, now, now, attributes
+        )
+
+    def _llm_call(self, start_ns, model, usage, error=None):
+        end_ns = time.time_ns()
+        self._local.last_llm_end = end_ns
+        current = self._current()
+        attributes = {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+        if error is not None:
+            attributes["error"] = repr(error)
+        self._record(
+            "llm",
+            model,
+            current["agent"] if current else "crew",
+            start_ns or end_ns,
+            end_ns,
+            attributes,
+        )
+
+    def _tool_steps(self, agent, step_output):
+        # crewai calls the step callback with [(AgentAction, observation)]
+        # right after the tools ran, so a tool took from the end of the LLM
+        # call that picked it until now.
+        if not isinstance(step_output, list):
+            return
+        now = time.time_ns()
+        start_ns = getattr(self._local, "last_llm_end", None) or now
+        for step in step_output:
+            if not isinstance(step, tuple) or len(step) != 2:
+                continue
+            action, observation = step
+            tool = getattr(action, "tool", "tool")
+            attributes = {
+                "input_chars": len(str(getattr(action, "tool_input", ""))),
+                "output_chars": len(str(observation)),
+            }
+            if tool in DELEGATION_TOOLS:
+                tool_input = getattr(action, "tool_input", {})
+                if isinstance(tool_input, str):
+                    try:
+                        tool_input = json.loads(tool_input)
+                    except ValueError:
+                        tool_input = {}
+                if isinstance(tool_input, dict):
+                    attributes["coworker"] = str(tool_input.get("coworker", ""))
+            self._record("tool", tool, agent.role, start_ns, now, attributes)
+            start_ns = now
+
+    def _add_callbacks(self, llm):
+        if llm is None or not hasattr(llm, "callbacks"):
+            return
+        callbacks = llm.callbacks
+        if callbacks is None:
+            llm.callbacks = [self._callbacks]
+        elif isinstance(callbacks, list):
+            if self._callbacks not in callbacks:
+                llm.callbacks = [*callbacks, self._callbacks]
+        else:
+            callbacks.add_handler(self._callbacks)
+
+    def instrument(self, crew):
+        """Hooks the tracer into the agents, their LLMs and the crew callbacks."""
+        task_ids = {id(task) for task in crew.tasks}
+        for agent in crew.agents:
+            self._add_callbacks(agent.llm)
+            self._add_callbacks(agent.function_calling_llm)
+            if id(agent) in self._instrumented:
+                continue
+            self._instrumented.add(id(agent))
+            self._instrument_agent(agent, crew, task_ids)
+        self._add_callbacks(getattr(crew, "manager_llm", None))
+
+    def _instrument_agent(self, agent, crew, task_ids):
+        execute_task = agent.execute_task
+
+        @functools.wraps(execute_task)
+        def traced_execute_task(task, context=None, tools=None):
+            current = self._current()
+            kind = "task" if id(task) in task_ids else "delegation"
+            title = " ".join(task.description.split())
+            attributes = {"description": title[:200]}
+            if kind == "delegation":
+                attributes["delegated_by"] = current["agent"] if current else "manager"
+            with self.span(kind, title[:60], agent=agent.role, **attributes) as span:
+                result = execute_task(task, context, tools)
+                span["output_chars"] = len(str(result))
+                return result
+
+        # Agent is a pydantic model, which does not allow setting methods
+        object.__setattr__(agent, "execute_task", traced_execute_task)
+
+        step_callback = agent.step_callback
+
+        def traced_step_callback(step_output):
+            self._tool_steps(agent, step_output)
+            # kickoff only hands the crew's step_callback to agents without one
+            callback = step_callback or crew.step_callback
+            if callback:
+                callback(step_output)
+
+        agent.step_callback = traced_step_callback
+
+    @contextmanager
+    def trace(self, crew, name="crew.kickoff"):
+        """Instruments the crew and records everything in the block as one trace."""
+        self.instrument(crew)
+        self.trace_id = os.urandom(16).hex()
+        self._root_id = None
+        try:
+            with self.span("crew", name, agent="crew") as attributes:
+                self._root_id = self._current()["span_id"]
+                attributes["tasks"] = len(crew.tasks)
+                attributes["agents"] = len(crew.agents)
+                yield self
+        finally:
+            self.export()
+
+    def export(self):
+        """Writes the buffered spans to `path` and clears the buffer."""
+        with self._lock:
+            spans, self._spans = self._spans, []
+        self._finished = spans
+        if not spans:
+            return
+        if self.format == "sqlite":
+            _write_sqlite(self.path, spans)
+        else:
+            _write_otlp_json(self.path, spans, self.service_name)
+
+    def summary(self):
+        """A report of the last trace."""
+        return summary_report(self._finished)
+
+
+def _write_sqlite(path, spans):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS spans (
+                trace_id TEXT, span_id TEXT PRIMARY KEY, parent_id TEXT,
+                kind TEXT, name TEXT, agent TEXT,
+                start_ns INTEGER, end_ns INTEGER, attributes TEXT
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS spans_trace ON spans (trace_id)")
+        conn.executemany(
+            "INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    s["trace_id"],
+                    s["span_id"],
+                    s["parent_id"],
+                    s["kind"],
+                    s["name"],
+                    s["agent"],
+                    s["start_ns"],
+                    s["end_ns"],
+                    json.dumps(s["attributes"]),
+                )
+                for s in spans
+            ],
+        )
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value):
+    if "intValue" in value:
+        return int(value["intValue"])
+    return next(iter(value.values()))
+
+
+def _write_otlp_json(path, spans, service_name):
+    otlp_spans = []
+    for s in spans:
+        attributes = {"crew.span.kind": s["kind"], "crew.agent": s["agent"] or "", **s["attributes"]}
+        otlp_span = {
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "name": s["name"],
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s["start_ns"]),
+            "endTimeUnixNano": str(s["end_ns"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+        }
+        if s["parent_id"]:
+            otlp_span["parentSpanId"] = s["parent_id"]
+        otlp_spans.append(otlp_span)
+    document = {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": _otlp_value(service_name)}]
+                },
+                "scopeSpans": [{"scope": {"name": "crew_tracing"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+    # one trace per line, like the OpenTelemetry collector file exporter
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(document) + "\n")
+
+
+def load_spans(path, trace_id=None):
+    """
+    Reads the spans of one trace back from a file written by LocalTracer.
+
+    :param path: str, a `.db` SQLite file or an OTLP-JSON lines file.
+    :param trace_id: str, the trace to load (default: the latest one).
+    """
+    if path.endswith((".db", ".sqlite")):
+        with sqlite3.connect(path) as conn:
+            if trace_id is None:
+                row = conn.execute(
+                    "SELECT trace_id FROM spans ORDER BY start_ns DESC LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return []
+                trace_id = row[0]
+            rows = conn.execute(
+                "SELECT trace_id, span_id, parent_id, kind, name, agent, start_ns, end_ns, "
+                "attributes FROM spans WHERE trace_id = ?",
+                (trace_id,),
+            ).fetchall()
+        keys = ("trace_id", "span_id", "parent_id", "kind", "name", "agent", "start_ns", "end_ns")
+        return [{**dict(zip(keys, row[:8])), "attributes": json.loads(row[8])} for row in rows]
+
+    spans = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            document = json.loads(line)
+            trace = []
+            for resource in document["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for s in scope["spans"]:
+                        attributes = {
+                            a["key"]: _from_otlp_value(a["value"]) for a in s["attributes"]
+                        }
+                        trace.append(
+                            {
+                                "trace_id": s["traceId"],
+                                "span_id": s["spanId"],
+                                "parent_id": s.get("parentSpanId"),
+                                "kind": attributes.pop("crew.span.kind"),
+                                "name": s["name"],
+                                "agent": attributes.pop("crew.agent") or None,
+                                "start_ns": int(s["startTimeUnixNano"]),
+                                "end_ns": int(s["endTimeUnixNano"]),
+                                "attributes": attributes,
+                            }
+                        )
+            if trace and (trace_id is None or trace[0]["trace_id"] == trace_id):
+                spans = trace
+    return spans
+
+
+def summary_report(spans, slowest=5):
+    """Formats per-agent totals and the slowest tasks of a trace."""
+    if not spans:
+        return "No spans recorded."
+
+    def seconds(span):
+        return (span["end_ns"] - span["start_ns"]) / 1e9
+
+    agents = defaultdict(lambda: defaultdict(float))
+    for span in spans:
+        totals = agents[span["agent"] or "crew"]
+        kind = span["kind"]
+        if kind in ("task", "delegation"):
+            totals[kind + "s"] += 1
+            totals["work_s"] += seconds(span)
+        elif kind == "llm":
+            totals["llm_calls"] += 1
+            totals["llm_s"] += seconds(span)
+            totals["prompt_tokens"] += span["attributes"].get("prompt_tokens", 0)
+            totals["completion_tokens"] += span["attributes"].get("completion_tokens", 0)
+        elif kind == "tool":
+            totals["tool_calls"] += 1
+            totals["tool_s"] += seconds(span)
+            if span["name"] in DELEGATION_TOOLS:
+                totals["hops"] += 1
+
+    crew_spans = [s for s in spans if s["kind"] == "crew"]
+    total_s = seconds(crew_spans[0]) if crew_spans else 0.0
+    llm_spans = [s for s in spans if s["kind"] == "llm"]
+    prompt = sum(s["attributes"].get("prompt_tokens", 0) for s in llm_spans)
+    completion = sum(s["attributes"].get("completion_tokens", 0) for s in llm_spans)
+
+    lines = [
+        f"Crew run: {total_s:.1f}s, {len(llm_spans)} LLM calls, "
+        f"{prompt + completion} tokens ({prompt} prompt / {completion} completion)",
+        "",
+        f"{'Agent':<40} {'Tasks':>5} {'Deleg.':>6} {'Work s':>8} {'LLM':>4} {'LLM s':>7} "
+        f"{'Tokens':>7} {'Tools':>5} {'Tool s':>7} {'Hops':>4}",
+    ]
+    for name, t in sorted(agents.items(), key=lambda item: -item[1]["work_s"]):
+        if not any(t.values()):
+            continue
+        tokens = int(t["prompt_tokens"] + t["completion_tokens"])
+        lines.append(
+            f"{name[:40]:<40} {int(t['tasks']):>5} {int(t['delegations']):>6} "
+            f"{t['work_s']:>8.1f} {int(t['llm_calls']):>4} {t['llm_s']:>7.1f} {tokens:>7} "
+            f"{int(t['tool_calls']):>5} {t['tool_s']:>7.1f} {int(t['hops']):>4}"
+        )
+
+    work = sorted(
+        (s for s in spans if s["kind"] in ("task", "delegation")), key=seconds, reverse=True
+    )
+    if work:
+        lines += ["", "Slowest tasks"]
+        for span in work[:slowest]:
+            lines.append(
+                f"  {seconds(span):>7.1f}s  {span['kind']:<10} {(span['agent'] or '')[:30]:<30} "
+                f"{span['name']}"
+            )
+    events = defaultdict(int)
+    for span in spans:
+        if span["kind"] == "event":
+            events[span["name"]] += 1
+    if events:
+        lines += ["", "Events"]
+        lines += [f"  {count:>5}  {name}" for name, count in sorted(events.items())]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python crew_tracing.py crew_traces.db
+    print(summary_report(load_spans(sys.argv[1] if len(sys.argv) > 1 else "crew_traces.db")))
@@ -1,9 +1,11 @@
-import agentops
 from crewai import Agent, Crew, Process, Task
 from dotenv import load_dotenv
 
+from crew_tracing import LocalTracer
+
 load_dotenv()
-agentops.init()
+# spans are written locally, run `python crew_tracing.py crew_traces.db` for a report
+tracer = LocalTracer("crew_traces.db")
 
 # Creating a senior researcher agent with memory and verbose mode
 joke_researcher = Agent(
@@ -70,5 +72,7 @@ crew = Crew(
     share_crew=True,
 )
 
-result = crew.kickoff(inputs={"topic": "AI engineer jokes"})
+with tracer.trace(crew):
+    result = crew.kickoff(inputs={"topic": "AI engineer jokes"})
 print(result)
+print(tracer.summary())
@@ -1,12 +1,13 @@
 from textwrap import dedent
 
-import agentops
 from crewai import Agent, Crew, Process, Task
 from dotenv import load_dotenv
 
+from crew_tracing import LocalTracer
+
 load_dotenv()
 
-agentops.init()
+tracer = LocalTracer("crew_traces.db")
 
 print("## Welcome to the Game Crew")
 print("-------------------------------")
@@ -102,7 +103,9 @@ crew = Crew(
 )
 
 # Get your crew to work!
-result = crew.kickoff()
+with tracer.trace(crew):
+    result = crew.kickoff()
 
 print("######################")
 print(result)
+print(tracer.summary())
@@ -1,13 +1,16 @@
 from textwrap import dedent
 
-import agentops
 from crewai import Agent, Crew, Process, Task
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 
+from crew_tracing import LocalTracer
+from delegation_guard import DelegationGuard
+from tool_cache import ToolResultCache
+
 load_dotenv()
 
-agentops.init()
+tracer = LocalTracer("crew_traces.db")
 
 print("## Welcome to the Game Crew")
 print("-------------------------------")
@@ -105,8 +108,18 @@ crew = Crew(
     ),  # Mandatory: Use a language model for manager
 )
 
+# Identical tool calls (including questions to co-workers) are answered once per run.
+tool_cache = ToolResultCache(ttl=600).install(crew)
+
+# Stop the manager from ping-ponging work between agents, every decision goes into the trace.
+guard = DelegationGuard(max_delegations=8, max_repeats=2, tracer=tracer).install(crew)
+
 # Get your crew to work!
-result = crew.kickoff()
+with tracer.trace(crew):
+    result = crew.kickoff()
 
 print("######################")
 print(result)
+print(tracer.summary())
+print(tool_cache.stats())
+print(guard.summary())
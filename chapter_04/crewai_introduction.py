@@ -1,6 +1,8 @@
 from crewai import Agent, Crew, Process, Task
 from dotenv import load_dotenv
 
+from tool_cache import ToolResultCache
+
 load_dotenv()
 
 # Creating a senior researcher agent with memory and verbose mode
@@ -68,5 +70,9 @@ crew = Crew(
     share_crew=True,
 )
 
+# Identical tool calls (including questions to co-workers) are answered once per run.
+tool_cache = ToolResultCache(ttl=600).install(crew)
+
 result = crew.kickoff(inputs={"topic": "AI engineer jokes"})
 print(result)
+print(tool_cache.stats())
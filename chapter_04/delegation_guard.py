@@ -0,0 +1,169 @@
+import functools
+import threading
+
+
+def _signature(coworker, description):
+    return coworker, " ".join(description.lower().split())
+
+
+class DelegationGuard:
+    """
+    Bounds how much work the agents of a crew can delegate to each other.
+
+    Every delegation (a co-worker asked to do work or answer a question)
+    is checked before the co-worker starts on it. It is refused when:
+
+    - the crew used up its delegation budget,
+    - the same co-worker was already given the same task `max_repeats` times,
+    - the co-worker is already somewhere up the current delegation chain
+      (A asks B, B asks A back),
+    - the recent delegations keep cycling through the same agents, e.g.
+      A, B, A, B, A, B with `max_cycle_repeats=3`.
+
+    A refused delegation does not call the LLM: the delegating agent gets a
+    short message telling it to finish the work itself. Each decision is
+    kept in `decisions` and, with a tracer, recorded as a trace event.
+
+        guard = DelegationGuard(max_delegations=6, tracer=tracer).install(crew)
+    """
+
+    def __init__(self, max_delegations=8, max_repeats=2, max_cycle_repeats=3, tracer=None):
+        """
+        :param max_delegations: int, delegations allowed in one crew run.
+        :param max_repeats: int, times the same task can go to the same co-worker.
+        :param max_cycle_repeats: int, times a cycle of 2 or 3 agents may repeat.
+        :param tracer: LocalTracer, optional, receives a `delegation.*` event per decision.
+        """
+        self.max_delegations = max_delegations
+        self.max_repeats = max_repeats
+        self.max_cycle_repeats = max_cycle_repeats
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Starts a new budget, e.g. before kicking the crew off again."""
+        with self._lock:
+            self.used = 0
+            self.history = []
+            self.repeats = {}
+            self.decisions = []
+
+    def _chain(self):
+        if not hasattr(self._local, "chain"):
+            self._local.chain = []
+        return self._local.chain
+
+    def _cycle(self, history):
+        """The repeating agent pattern at the end of `history`, or None."""
+        for length in (2, 3):
+            span = length * self.max_cycle_repeats
+            if len(history) < span:
+                continue
+            pattern = history[-length:]
+            if len(set(pattern)) == length and history[-span:] == pattern * self.max_cycle_repeats:
+                return pattern
+        return None
+
+    def check(self, coworker, description):
+        """
+        Decides whether `coworker` may start on a delegated task.
+
+        :return: tuple of (allowed, message), the message explains a refusal.
+        """
+        signature = _signature(coworker, description)
+        chain = self._chain()
+        with self._lock:
+            repeats = self.repeats.get(signature, 0)
+            cycle = self._cycle(self.history + [coworker])
+            if self.used >= self.max_delegations:
+                reason = "budget"
+                message = (
+                    f"Delegation budget exhausted ({self.used}/{self.max_delegations}). "
+                    "Do not delegate or ask co-workers again, finish the task yourself "
+                    "with the information you already have."
+                )
+            elif repeats >= self.max_repeats:
+                reason = "repeat"
+                message = (
+                    f"{coworker} was already given this task {repeats} times. "
+                    "Use the answers you already have instead of delegating it again."
+                )
+            elif coworker in chain:
+                reason = "loop"
+                message = (
+                    f"{coworker} is already waiting on this delegation chain "
+                    f"({' -> '.join(chain)}), delegating back to them would loop. "
+                    "Do the work yourself."
+                )
+            elif cycle:
+                reason = "cycle"
+                message = (
+                    f"Delegating to {coworker} again repeats the cycle "
+                    f"{' -> '.join(cycle)} {self.max_cycle_repeats} times. "
+                    "Stop delegating and give your final answer."
+                )
+            else:
+                reason = "ok"
+                message = None
+                self.used += 1
+                self.history.append(coworker)
+                self.repeats[signature] = repeats + 1
+
+            decision = {
+                "coworker": coworker,
+                "allowed": message is None,
+                "reason": reason,
+                "used": self.used,
+                "budget": self.max_delegations,
+            }
+            self.decisions.append(decision)
+
+        if self.tracer is not None:
+            self.tracer.event(
+                "delegation.allowed" if message is None else "delegation.blocked",
+                **decision,
+                task=description[:200],
+            )
+        return message is None, message
+
+    def install(self, crew):
+        """Checks every delegation to the crew's agents before it runs."""
+        if self.tracer is not None:
+            # instrument first, so refused delegations are not traced as work
+            self.tracer.instrument(crew)
+        task_ids = {id(task) for task in crew.tasks}
+        for agent in crew.agents:
+            self._install_agent(agent, task_ids)
+        return self
+
+    def _install_agent(self, agent, task_ids):
+        execute_task = agent.execute_task
+
+        @functools.wraps(execute_task)
+        def guarded_execute_task(task, context=None, tools=None):
+            # the agent's own task is not a delegation, but starts a chain
+            if id(task) not in task_ids:
+                allowed, message = self.check(agent.role, task.description)
+                if not allowed:
+                    return message
+            chain = self._chain()
+            chain.append(agent.role)
+            try:
+                return execute_task(task, context, tools)
+            finally:
+                chain.pop()
+
+        # Agent is a pydantic model, which does not allow setting methods
+        object.__setattr__(agent, "execute_task", guarded_execute_task)
+
+    def summary(self):
+        blocked = [d for d in self.decisions if not d["allowed"]]
+        reasons = {}
+        for decision in blocked:
+            reasons[decision["reason"]] = reasons.get(decision["reason"], 0) + 1
+        return (
+            f"{self.used}/{self.max_delegations} delegations used, {len(blocked)} blocked"
+            + (f" ({', '.join(f'{k}: {v}' for k, v in reasons.items())})" if reasons else "")
+        )
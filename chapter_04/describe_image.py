@@ -1,36 +1,117 @@
 import base64
+import hashlib
+import io
+import json
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # without Pillow images are sent as they are
+    Image = None
+
+MODEL = "gpt-4-turbo"
+PROMPT = "What’s in this image?"
+CACHE_FILE = "image_descriptions.json"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# GPT-4 Vision scales high detail images to fit 2048x2048, then to 768px on the
+# shortest side, so anything larger only adds payload.
+MAX_SIDE = 2048
+MAX_SHORT_SIDE = 768
+
+
+# Function to guess the MIME type from the file signature
+def sniff_mime_type(data):
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    elif data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    elif data.startswith(b"GIF87a") or data.startswith(b"GIF89a"):
+        return "image/gif"
+    elif data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
 
 
-def describe_image(image_path="animals.png") -> str:
+def preprocess_image(image_path, max_side=MAX_SIDE, max_short_side=MAX_SHORT_SIDE):
     """
-    Uses GPT-4 Vision to inspect and describe the contents of the image.
+    Downsizes the image to the resolution the model actually uses and
+    re-encodes it compactly.
 
-    :param input_path: str, the name of the PNG file to describe.
+    :param image_path: str, the image file to preprocess.
+    :return: tuple of (image bytes, MIME type, SHA-256 of the image bytes).
     """
-    api_key = os.environ['OPEN_API_KEY']
+    with open(image_path, "rb") as image_file:
+        data = image_file.read()
+    if Image is None:
+        return data, sniff_mime_type(data), hashlib.sha256(data).hexdigest()
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        scale = min(
+            1.0,
+            max_side / max(image.size),
+            max_short_side / min(image.size),
+        )
+        if scale < 1.0:
+            size = (round(image.width * scale), round(image.height * scale))
+            image = image.resize(size, Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        has_alpha = image.mode in ("RGBA", "LA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        if has_alpha:
+            # keep transparency, JPEG cannot store it
+            image.save(buffer, format="PNG", optimize=True)
+            mime_type = "image/png"
+        else:
+            image.convert("RGB").save(buffer, format="JPEG", quality=85, optimize=True)
+            mime_type = "image/jpeg"
+        encoded = buffer.getvalue()
+        if scale == 1.0 and sniff_mime_type(data) == mime_type and len(data) <= len(encoded):
+            # the original file is already as compact as the re-encoded one
+            encoded = data
+        # keyed on the bytes actually sent, so only an identical image reuses a description
+        return encoded, mime_type, hashlib.sha256(encoded).hexdigest()
 
-    # Function to encode the image
-    def encode_image(image_path):
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
 
+def load_cache(cache_file=CACHE_FILE):
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_cache(cache, cache_file=CACHE_FILE):
+    tmp_file = f"{cache_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump(cache, file, indent=2)
+    os.replace(tmp_file, cache_file)
+
+
+def request_description(image_bytes, mime_type, api_key, session=None):
+    """Sends one image to GPT-4 Vision and returns its description."""
     # Getting the base64 string
-    base64_image = encode_image(image_path)
+    base64_image = base64.b64encode(image_bytes).decode("utf-8")
 
     headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
 
     payload = {
-        "model": "gpt-4-turbo",
+        "model": MODEL,
         "messages": [
             {
                 "role": "user",
                 "content": [
-                    {"type": "text", "text": "What’s in this image?"},
+                    {"type": "text", "text": PROMPT},
                     {
                         "type": "image_url",
-                        "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"},
+                        "image_url": {"url": f"data:{mime_type};base64,{base64_image}"},
                     },
                 ],
             }
@@ -38,11 +119,147 @@ def describe_image(image_path="animals.png") -> str:
         "max_tokens": 300,
     }
 
-    response = requests.post(
-        "https://api.openai.com/v1/chat/completions", headers=headers, json=payload
+    response = (session or requests).post(
+        "https://api.openai.com/v1/chat/completions", headers=headers, json=payload, timeout=120
     )
+    response.raise_for_status()
 
     return response.json()["choices"][0]["message"]["content"]
 
 
+def describe_image(image_path="animals.png", use_cache=True, cache_file=CACHE_FILE) -> str:
+    """
+    Uses GPT-4 Vision to inspect and describe the contents of the image.
+
+    :param input_path: str, the name of the PNG file to describe.
+    :param use_cache: bool, reuse the description of an identical image.
+    """
+    api_key = os.environ['OPEN_API_KEY']
+
+    # Downsize, re-encode and hash the image
+    image_bytes, mime_type, image_hash = preprocess_image(image_path)
+
+    cache_key = f"{MODEL}:{PROMPT}:{image_hash}"
+    cache = load_cache(cache_file) if use_cache else {}
+    if cache_key in cache:
+        return cache[cache_key]
+
+    description = request_description(image_bytes, mime_type, api_key)
+    if use_cache:
+        cache[cache_key] = description
+        save_cache(cache, cache_file)
+    return description
+
+
+# Function to create a session that keeps up to pool_size connections alive
+def make_session(pool_size=8):
+    session = requests.Session()
+    retries = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None,  # also retry the POST requests
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("https://", adapter)
+    return session
+
+
+# Function to list the images of a directory lazily
+def iter_images(directory):
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+            yield entry.path
+
+
+def describe_images(
+    images,
+    output_path="descriptions.jsonl",
+    max_workers=8,
+    use_cache=True,
+    cache_file=CACHE_FILE,
+):
+    """
+    Describes many images concurrently and appends one JSON line per image
+    to output_path as soon as it is done.
+
+    :param images: str or iterable, a directory or an iterator of image paths.
+    :param output_path: str, the JSONL file; images already in it are skipped.
+    :param max_workers: int, maximum number of requests in flight.
+    :return: int, the number of images described in this run.
+    """
+    api_key = os.environ['OPEN_API_KEY']
+    if isinstance(images, str) and os.path.isdir(images):
+        images = iter_images(images)
+
+    # resume: skip images already described, failed ones are tried again
+    done = set()
+    ends_with_newline = True
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8") as file:
+            for line in file:
+                ends_with_newline = line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except ValueError:  # e.g. a line cut off by an interrupted run
+                    continue
+                if "description" in record:
+                    done.add(record["image"])
+
+    cache = load_cache(cache_file) if use_cache else {}
+    session = make_session(pool_size=max_workers)
+
+    def describe(image_path):
+        image_bytes, mime_type, image_hash = preprocess_image(image_path)
+        cache_key = f"{MODEL}:{PROMPT}:{image_hash}"
+        if cache_key in cache:
+            return cache[cache_key], cache_key
+        return request_description(image_bytes, mime_type, api_key, session), cache_key
+
+    count = 0
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, open(
+        output_path, "a", encoding="utf-8"
+    ) as output:
+        if not ends_with_newline:
+            # start after a truncated last line instead of appending to it
+            output.write("\n")
+
+        def write_finished(block):
+            nonlocal count
+            finished, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in finished:
+                image_path = in_flight.pop(future)
+                try:
+                    description, cache_key = future.result()
+                    record = {"image": image_path, "description": description}
+                    cache[cache_key] = description
+                    count += 1
+                except Exception as error:
+                    record = {"image": image_path, "error": str(error)}
+                    print(f"Failed to describe {image_path}: {error}")
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+
+        try:
+            for image_path in images:
+                if image_path in done:
+                    continue
+                # only keep a bounded number of images in memory
+                while len(in_flight) >= max_workers * 2:
+                    write_finished(block=True)
+                in_flight[pool.submit(describe, image_path)] = image_path
+                write_finished(block=False)
+            while in_flight:
+                write_finished(block=True)
+        finally:
+            if use_cache:
+                save_cache(cache, cache_file)
+            session.close()
+
+    return count
+
+
 # print(describe_image())
+# print(describe_images("frames", output_path="frames.jsonl"))
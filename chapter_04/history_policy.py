@@ -0,0 +1,118 @@
+import re
+
+from autogen.agentchat.contrib.capabilities.transform_messages import TransformMessages
+from autogen.agentchat.contrib.capabilities.transforms import MessageTokenLimiter
+from autogen.token_count_utils import count_token
+
+from warm_executor import code_filename
+
+CODE_BLOCK = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
+# lines worth keeping from an old critique: scores, list items and headings
+CRITIQUE_LINE = re.compile(r"^\s*([-*•]|\d+[.)]|#+|\{|.*\bscore\b|.*:\s*\d+\s*/?\s*\d*)", re.I)
+
+
+def _count_tokens(messages):
+    return sum(
+        count_token(m["content"]) for m in messages if isinstance(m.get("content"), str)
+    )
+
+
+class LatestCodeArtifacts:
+    """
+    Keeps only the newest version of each code artifact in the history.
+
+    Code blocks are identified by their `# filename:` comment; blocks
+    without one are always kept, since nothing says which program they
+    belong to. Older versions are replaced by a short placeholder so the
+    agent still sees that code was written earlier.
+    """
+
+    def apply_transform(self, messages):
+        seen = set()
+        processed = []
+        for message in reversed(messages):
+            content = message.get("content")
+            if isinstance(content, str) and "```" in content:
+                message = {**message, "content": self._strip_old_code(content, seen)}
+            processed.insert(0, message)
+        return processed
+
+    def _strip_old_code(self, content, seen):
+        written = set()
+        # newer messages were processed first, so an artifact in `seen` has a
+        # newer version; blocks of the same message never replace each other
+        for match in reversed(list(CODE_BLOCK.finditer(content))):
+            language, code = match.group(1), match.group(2)
+            artifact = code_filename(code)
+            if artifact is None:
+                continue
+            if artifact in seen:
+                placeholder = f"```{language}\n# [older version of {artifact} omitted]\n```"
+                content = content[: match.start()] + placeholder + content[match.end():]
+            written.add(artifact)
+        seen.update(written)
+        return content
+
+    def get_logs(self, pre_transform_messages, post_transform_messages):
+        saved = _count_tokens(pre_transform_messages) - _count_tokens(post_transform_messages)
+        if saved > 0:
+            return f"Omitted superseded code, saving {saved} tokens.", True
+        return "No superseded code to omit.", False
+
+
+class OldCritiqueSummarizer:
+    """
+    Shortens all but the latest `keep_last` critiques to their scores and
+    action items, without calling an LLM.
+    """
+
+    def __init__(self, critic_names=("Critic",), keep_last=1, max_lines=10):
+        self._critic_names = set(critic_names)
+        self._keep_last = keep_last
+        self._max_lines = max_lines
+
+    def apply_transform(self, messages):
+        critiques = [
+            i
+            for i, m in enumerate(messages)
+            if m.get("name") in self._critic_names and isinstance(m.get("content"), str)
+        ]
+        old = critiques[: -self._keep_last] if self._keep_last else critiques
+        processed = list(messages)
+        for i in old:
+            lines = [
+                line.strip()
+                for line in messages[i]["content"].splitlines()
+                if CRITIQUE_LINE.match(line)
+            ][: self._max_lines]
+            summary = "\n".join(["[summary of an earlier critique]", *lines])
+            if len(summary) < len(messages[i]["content"]):
+                processed[i] = {**messages[i], "content": summary}
+        return processed
+
+    def get_logs(self, pre_transform_messages, post_transform_messages):
+        saved = _count_tokens(pre_transform_messages) - _count_tokens(post_transform_messages)
+        if saved > 0:
+            return f"Summarized earlier critiques, saving {saved} tokens.", True
+        return "No earlier critiques to summarize.", False
+
+
+def add_history_policy(agents, max_tokens=6000, critic_names=("Critic",), verbose=False):
+    """
+    Limits the history each agent sends to the LLM: only the latest version of
+    every code artifact is kept, earlier critiques are summarized and the rest
+    is truncated to a per-agent token budget (oldest messages go first).
+
+    :param agents: list of ConversableAgent to apply the policy to.
+    :param max_tokens: int or dict of agent name -> int, the token budget.
+    :param critic_names: names of the agents whose messages are critiques.
+    """
+    for agent in agents:
+        budget = max_tokens.get(agent.name) if isinstance(max_tokens, dict) else max_tokens
+        transforms = [
+            LatestCodeArtifacts(),
+            OldCritiqueSummarizer(critic_names=critic_names),
+        ]
+        if budget:
+            transforms.append(MessageTokenLimiter(max_tokens=budget))
+        TransformMessages(transforms=transforms, verbose=verbose).add_to_agent(agent)
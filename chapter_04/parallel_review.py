@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from autogen import ConversableAgent
+
+
+def merge_reviews(reviews):
+    """Merge (reviewer name, summary) pairs into a single review."""
+    sections = [f"## {name} review\n{summary.strip()}" for name, summary in reviews if summary]
+    return "\n\n".join(sections)
+
+
+class ConcurrentReviews:
+    """
+    A `reply_func_from_nested_chats` that runs every chat in the nested chat
+    queue at the same time instead of one after another, then merges their
+    summaries into one reply.
+
+        user_proxy.register_nested_chats(
+            [{"recipient": reviewer, "message": review_code, "max_turns": 1} for reviewer in reviewers],
+            trigger=engineer,
+            reply_func_from_nested_chats=ConcurrentReviews(),
+        )
+
+    Each reviewer talks to its own throwaway sender agent, so the
+    conversations do not share any state. Chats are silent by default to
+    keep concurrent output from interleaving on the console.
+    """
+
+    def __init__(self, max_workers=None, merge=merge_reviews):
+        """
+        :param max_workers: int, reviewers run at the same time (default: all).
+        :param merge: callable, turns a list of (reviewer name, summary) into the reply.
+        """
+        self.max_workers = max_workers
+        self.merge = merge
+
+    def __call__(self, chat_queue, recipient, messages, sender, config):
+        chats = []
+        for i, chat in enumerate(chat_queue):
+            chat = dict(chat)
+            message = chat.get("message")
+            # same defaults as AutoGen's own nested chats
+            if message is None and i == 0:
+                message = messages[-1].get("content")
+            if callable(message):
+                message = message(recipient, messages, sender, config)
+            if not message:
+                continue
+            chat["message"] = message
+            chat.setdefault("silent", True)
+            if chat.get("sender") is None:
+                chat["sender"] = ConversableAgent(
+                    name=f"{recipient.name}_{chat['recipient'].name}",
+                    llm_config=False,
+                    code_execution_config=False,
+                    human_input_mode="NEVER",
+                )
+            chats.append(chat)
+        if not chats:
+            return True, None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(chats)) as pool:
+            results = list(pool.map(self._run_chat, chats))
+        return True, self.merge(results)
+
+    @staticmethod
+    def _run_chat(chat):
+        chat_sender = chat.pop("sender")
+        chat.pop("chat_id", None)
+        chat.setdefault("clear_history", True)
+        result = chat_sender.initiate_chat(**chat)
+        return chat["recipient"].name, result.summary
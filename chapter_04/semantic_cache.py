@@ -0,0 +1,165 @@
+import hashlib
+import json
+
+import numpy as np
+
+from bounded_cache import BoundedCache
+
+
+class SemanticCache(BoundedCache):
+    """
+    An AutoGen cache backend that falls back to a nearest-neighbour lookup over
+    request embeddings when there is no exact hit.
+
+    Use it anywhere a `Cache.disk(...)` object is accepted:
+
+        with SemanticCache() as cache:
+            user_proxy.initiate_chat(engineer, message=task, cache=cache)
+
+    Entries live in one SQLite file that is independent of any cache seed, so
+    every script pointing at the same path shares the same cached turns.
+    A cached reply is only reused for a request with the same model settings,
+    the same system message, the same number of messages and the same latest
+    message, and only when the earlier conversations are at least `threshold`
+    cosine similar.
+
+    It is a BoundedCache, so it can also be capped and report per-agent
+    counters; by default it is unbounded and exports no metrics.
+    """
+
+    EXTRA_COLUMNS = (
+        "scope TEXT NOT NULL DEFAULT ''",
+        "prompt TEXT NOT NULL DEFAULT ''",
+        "embedding BLOB",
+    )
+    INDEXES = ("CREATE INDEX IF NOT EXISTS entries_scope ON entries (scope)",)
+
+    def __init__(
+        self,
+        path=".cache/semantic_cache.db",
+        threshold=0.92,
+        embedding_model="text-embedding-3-small",
+        embed_fn=None,
+        max_chars=8000,
+        max_entries=None,
+        max_bytes=None,
+        policy="lru",
+        metrics_path=None,
+    ):
+        """
+        :param path: str, the SQLite file used to store the cache.
+        :param threshold: float, minimum cosine similarity for a semantic hit.
+        :param embedding_model: str, the OpenAI embedding model to use.
+        :param embed_fn: callable, optional function mapping a string to a vector.
+        :param max_chars: int, the prompt text is clipped to this many characters.
+        :param max_entries, max_bytes, policy, metrics_path: see BoundedCache.
+        """
+        super().__init__(
+            path=path,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            policy=policy,
+            metrics_path=metrics_path,
+        )
+        self.threshold = threshold
+        self.embedding_model = embedding_model
+        self.max_chars = max_chars
+        self._embed_fn = embed_fn
+        self._client = None
+        # scope -> (keys, normalized embedding matrix)
+        self._index = {}
+
+    def _embed(self, text):
+        if self._embed_fn is not None:
+            vector = self._embed_fn(text)
+        else:
+            if self._client is None:
+                from openai import OpenAI
+
+                self._client = OpenAI()
+            response = self._client.embeddings.create(
+                input=[text], model=self.embedding_model
+            )
+            vector = response.data[0].embedding
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _describe(self, key):
+        """Split a request key into the part that must match exactly (scope)
+        and the conversation text that is compared semantically (prompt)."""
+        try:
+            params = json.loads(key)
+        except (TypeError, ValueError):
+            return hashlib.sha256(str(key).encode()).hexdigest(), str(key)
+        messages = params.pop("messages", None) or []
+        if isinstance(params.get("prompt"), str):
+            messages = [{"role": "user", "content": params.pop("prompt")}]
+
+        system, turns = [], []
+        for message in messages:
+            content = message.get("content")
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True)
+            if message.get("role") == "system":
+                system.append(content)
+            else:
+                turns.append(f"{message.get('role')}: {content}")
+
+        # The latest turn must match exactly once there is earlier context:
+        # replies to "exitcode: 1" and "exitcode: 0" after the same code differ,
+        # and their transcripts would still be nearly identical. Only a lone
+        # first message (the task) is compared semantically.
+        last = None
+        if len(turns) > 1:
+            last = hashlib.sha256(turns.pop().encode()).hexdigest()
+        scope = json.dumps(
+            {"params": params, "system": system, "turns": len(turns), "last": last},
+            sort_keys=True,
+        )
+        prompt = "\n".join(turns)
+        if len(prompt) > self.max_chars:
+            # keep the task at the start and the most recent turns at the end
+            half = self.max_chars // 2
+            prompt = prompt[:half] + "\n...\n" + prompt[-half:]
+        return hashlib.sha256(scope.encode()).hexdigest(), prompt
+
+    def _load_index(self, scope):
+        if scope not in self._index:
+            rows = (
+                self._connect()
+                .execute("SELECT key, embedding FROM entries WHERE scope = ?", (scope,))
+                .fetchall()
+            )
+            keys = [row[0] for row in rows]
+            matrix = (
+                np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+                if rows
+                else None
+            )
+            self._index[scope] = (keys, matrix)
+        return self._index[scope]
+
+    def _find_similar(self, conn, key):
+        scope, prompt = self._describe(key)
+        embedding = self._embed(prompt)
+        # kept until set(), so the miss is not embedded twice
+        info = (scope, prompt, embedding)
+        keys, matrix = self._load_index(scope)
+        if matrix is None:
+            return None, info
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None, info
+        return keys[best], info
+
+    def _entry_columns(self, key, info):
+        scope, prompt, embedding = info or (*self._describe(key), None)
+        if embedding is None:
+            embedding = self._embed(prompt)
+        self._index.pop(scope, None)
+        return {"scope": scope, "prompt": prompt, "embedding": embedding.tobytes()}
+
+    def _forget(self, keys):
+        self._index.clear()
@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+Rule = namedtuple("Rule", ["last_speaker", "next_speaker", "when"])
+
+
+# Predicates over the last group chat message
+def has_code(message):
+    return "```" in (message.get("content") or "")
+
+
+def is_execution_result(message):
+    return (message.get("content") or "").startswith("exitcode:")
+
+
+def execution_succeeded(message):
+    return (message.get("content") or "").startswith("exitcode: 0")
+
+
+def execution_failed(message):
+    return is_execution_result(message) and not execution_succeeded(message)
+
+
+class SpeakerRules:
+    """
+    A rule table for GroupChat speaker selection.
+
+    Each rule says "after `last_speaker`, if `when(last_message)` holds, the
+    next speaker is `next_speaker`". When exactly one next speaker matches it
+    is picked locally; otherwise the choice is handed back to GroupChat's
+    `fallback` method ("auto" asks the LLM).
+
+        rules = SpeakerRules()
+        rules.add(engineer, user_proxy, when=has_code)
+        groupchat = GroupChat(agents, speaker_selection_method=rules)
+    """
+
+    def __init__(self, rules=None, fallback="auto"):
+        self.rules = list(rules or [])
+        self.fallback = fallback
+        self.local_picks = 0
+        self.fallback_picks = 0
+
+    def add(self, last_speaker, next_speaker, when=None):
+        """Add a transition, speakers can be agents or agent names."""
+        self.rules.append(
+            Rule(
+                getattr(last_speaker, "name", last_speaker),
+                getattr(next_speaker, "name", next_speaker),
+                when,
+            )
+        )
+        return self
+
+    def __call__(self, last_speaker, groupchat):
+        message = groupchat.messages[-1] if groupchat.messages else {}
+        candidates = {
+            rule.next_speaker
+            for rule in self.rules
+            if rule.last_speaker == last_speaker.name
+            and (rule.when is None or rule.when(message))
+        }
+        if len(candidates) == 1:
+            self.local_picks += 1
+            return groupchat.agent_by_name(candidates.pop())
+        self.fallback_picks += 1
+        return self.fallback
+
+
+def coding_group_rules(user_proxy, engineer, critic):
+    """Rules for the user/engineer/critic coding loop:
+    the engineer's code is executed by the user proxy, failures go back to the
+    engineer, successful runs go to the critic, and critique goes back to the
+    engineer. Anything else (e.g. the engineer replying without code) is left
+    to the LLM."""
+    return (
+        SpeakerRules()
+        .add(user_proxy, engineer, when=lambda m: not is_execution_result(m))
+        .add(user_proxy, engineer, when=execution_failed)
+        .add(user_proxy, critic, when=execution_succeeded)
+        .add(engineer, user_proxy, when=has_code)
+        .add(critic, engineer)
+    )
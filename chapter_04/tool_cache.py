@@ -0,0 +1,148 @@
+import functools
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+DELEGATE_WORK = "Delegate work to co-worker"
+
+
+def canonical_arguments(value):
+    """Normalizes tool arguments so equivalent calls get the same key:
+    dict keys are sorted, whitespace in strings is collapsed and numbers
+    compare by value (1 == 1.0)."""
+    if isinstance(value, dict):
+        return {str(k): canonical_arguments(v) for k, v in sorted(value.items(), key=str)}
+    if isinstance(value, (list, tuple)):
+        return [canonical_arguments(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return repr(value)
+
+
+class ToolResultCache:
+    """
+    A tool-call cache shared by all the agents of one crew run.
+
+    Calls are keyed by the tool name and its canonical arguments, results
+    expire after a TTL, and when several agents make the same call at the
+    same time only the first one runs the tool, the others wait for its
+    result. Exceptions and "Error..." results are never cached.
+
+        cache = ToolResultCache(ttl=600)
+        cache.install(crew)
+        crew.kickoff()
+
+    Unlike the crew's own `cache=True`, it also covers the co-worker tools
+    crewai adds for delegation, so the same question asked to the same
+    co-worker twice is answered once. "Delegate work to co-worker" is not
+    cached by default since the delegated work may have side effects.
+    """
+
+    def __init__(self, ttl=600, tool_ttls=None, exclude=(DELEGATE_WORK,)):
+        """
+        :param ttl: float, seconds a result stays valid (None: the whole run).
+        :param tool_ttls: dict of tool name -> ttl, overrides `ttl` per tool.
+        :param exclude: names of tools that are never cached.
+        """
+        self.ttl = ttl
+        self.tool_ttls = dict(tool_ttls or {})
+        self.exclude = set(exclude)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._results = {}  # key -> (expires_at, result)
+        self._in_flight = {}  # key -> Future
+        self._wrapped = set()
+        self._lock = threading.Lock()
+
+    def _key(self, tool, args, kwargs):
+        arguments = dict(zip(getattr(tool, "args", None) or {}, args))
+        if len(arguments) < len(args):
+            arguments["*args"] = list(args)
+        # the callbacks differ per call and are not arguments of the tool
+        arguments.update(
+            (k, v) for k, v in kwargs.items() if k not in ("run_manager", "callbacks")
+        )
+        return tool.name, json.dumps(canonical_arguments(arguments), sort_keys=True)
+
+    def call(self, tool, run, args, kwargs):
+        """Returns the cached result of `run(*args, **kwargs)` or runs it once."""
+        key = self._key(tool, args, kwargs)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and (cached[0] is None or cached[0] > time.monotonic()):
+                self.hits += 1
+                return cached[1]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = run(*args, **kwargs)
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(error)
+            raise
+        ttl = self.tool_ttls.get(tool.name, self.ttl)
+        with self._lock:
+            del self._in_flight[key]
+            if not (isinstance(result, str) and result.startswith("Error")):
+                self._results[key] = (None if ttl is None else time.monotonic() + ttl, result)
+        future.set_result(result)
+        return result
+
+    def wrap_tool(self, tool):
+        """Routes the tool's `_run` through the cache (once per tool object)."""
+        if tool.name in self.exclude or id(tool) in self._wrapped:
+            return tool
+        self._wrapped.add(id(tool))
+        run = tool._run
+
+        @functools.wraps(run)
+        def cached_run(*args, **kwargs):
+            return self.call(tool, run, args, kwargs)
+
+        # tools are pydantic models, which do not allow setting methods
+        object.__setattr__(tool, "_run", cached_run)
+        return tool
+
+    def install(self, crew):
+        """
+        Caches every tool the crew's tasks run with, including the delegation
+        tools that crewai only creates during kickoff.
+        """
+        for task in crew.tasks:
+            self._install_task(task)
+        return self
+
+    def _install_task(self, task):
+        execute = task.execute
+
+        @functools.wraps(execute)
+        def execute_with_cache(agent=None, context=None, tools=None):
+            agent = agent or task.agent
+            # the same fallbacks as Task.execute and Agent.execute_task
+            tools = tools or task.tools or (agent.tools if agent else None) or []
+            tools = [self.wrap_tool(tool) for tool in tools]
+            return execute(agent=agent, context=context, tools=tools)
+
+        object.__setattr__(task, "execute", execute_with_cache)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
@@ -0,0 +1,386 @@
+import atexit
+import builtins
+import importlib
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import traceback
+import types
+from contextlib import contextmanager
+from importlib.machinery import ModuleSpec
+from pathlib import Path
+
+from autogen.coding import LocalCommandLineCodeExecutor, MarkdownCodeExtractor
+from autogen.coding.base import CommandLineCodeResult
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module, memory limits are skipped
+    resource = None
+
+PYTHON_VARIANTS = ["python", "py", "python3"]
+DEFAULT_PRELOAD = (
+    "collections",
+    "datetime",
+    "itertools",
+    "json",
+    "math",
+    "random",
+    "re",
+    "time",
+)
+FILENAME_PATTERN = re.compile(r"^#\s*filename:\s*(.+?)\s*$")
+TIMEOUT_EXIT_CODE = 124  # same exit code as the timeout command on linux
+
+
+def code_filename(code):
+    """The file a code block names in its `# filename:` first line, or None."""
+    match = FILENAME_PATTERN.match(code.split("\n", 1)[0])
+    return match.group(1) if match else None
+
+
+def _mapped_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        return 0
+
+
+def _namespaces(names):
+    """Shallow copies of module namespaces, to spot monkey-patching."""
+    return {name: dict(vars(sys.modules[name])) for name in names if name in sys.modules}
+
+
+def _patched(namespaces):
+    for name, namespace in namespaces.items():
+        module = sys.modules.get(name)
+        if module is None:
+            return True
+        current = vars(module)
+        if current.keys() != namespace.keys():
+            return True
+        if any(current[key] is not value for key, value in namespace.items()):
+            return True
+    return False
+
+
+def _is_pure_python(module):
+    return (getattr(module, "__file__", None) or "").endswith((".py", ".pyc"))
+
+
+@contextmanager
+def _captured_fd(fd, file):
+    """Points file descriptor `fd` to `file`, so output of subprocesses and C code is kept too."""
+    saved = os.dup(fd)
+    os.dup2(file.fileno(), fd)
+    try:
+        yield
+    finally:
+        os.dup2(saved, fd)
+        os.close(saved)
+
+
+def _read_output(file):
+    file.seek(0)
+    output = file.read().decode("utf-8", errors="replace")
+    file.seek(0)
+    file.truncate()
+    return output
+
+
+@contextmanager
+def _main_not_reimported():
+    """
+    Spawned and fork server children run the parent's main script again
+    before the target, unless the main module was imported by name. The
+    workers only need this module, so while one starts the main module is
+    reported as `__main__` by name, which the child leaves alone.
+    """
+    main = sys.modules["__main__"]
+    spec = getattr(main, "__spec__", None)
+    main.__spec__ = ModuleSpec("__main__", None)
+    try:
+        yield
+    finally:
+        main.__spec__ = spec
+
+
+def _worker_main(conn, work_dir, preload, memory_limit_mb):
+    """Loop run by each pooled interpreter: execute code sent by the parent."""
+    if resource is not None and memory_limit_mb:
+        # the limit is applied on top of what the interpreter already mapped
+        limit = memory_limit_mb * 1024 * 1024 + _mapped_bytes()
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    work_dir = os.path.abspath(work_dir)
+    os.chdir(work_dir)
+    if work_dir not in sys.path:
+        sys.path.insert(0, work_dir)
+    watched = ("builtins", "os", *preload)
+    stdout, stderr = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        code, filename = request
+
+        # state restored after the run, every block starts like a fresh script
+        modules = set(sys.modules)
+        environ = dict(os.environ)
+        argv, path = list(sys.argv), list(sys.path)
+        namespaces = _namespaces(watched)
+
+        os.chdir(work_dir)
+        exit_code = 0
+        # the block runs as the __main__ module, so what it defines can be
+        # pickled, e.g. functions it hands to multiprocessing
+        main = sys.modules["__main__"]
+        script = types.ModuleType("__main__")
+        script.__file__ = filename or "<code>"
+        script.__builtins__ = builtins
+        sys.modules["__main__"] = script
+        sys.stdout.flush()
+        sys.stderr.flush()
+        with _captured_fd(1, stdout), _captured_fd(2, stderr):
+            try:
+                exec(compile(code, filename or "<code>", "exec"), vars(script))
+            except SystemExit as exit_signal:
+                if isinstance(exit_signal.code, int):
+                    exit_code = exit_signal.code
+                elif exit_signal.code is not None:
+                    print(exit_signal.code, file=sys.stderr)
+                    exit_code = 1
+            except BaseException as err:
+                # drop this loop's own frame from the traceback
+                traceback.print_exception(type(err), err, err.__traceback__.tb_next)
+                exit_code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+        sys.modules["__main__"] = main
+
+        os.environ.clear()
+        os.environ.update(environ)
+        sys.argv[:] = argv
+        sys.path[:] = path
+        # forget what the code imported, so edited work dir files are reloaded
+        # and nothing it set up leaks into the next block; extension modules
+        # cannot be imported twice, so those retire the worker instead
+        recycle = False
+        for name in set(sys.modules) - modules:
+            if _is_pure_python(sys.modules[name]):
+                del sys.modules[name]
+            else:
+                recycle = True
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None) or ""
+            if module_file.startswith(work_dir + os.sep):
+                del sys.modules[name]
+        # patched preloaded modules or builtins, and threads the code left
+        # running, cannot be undone either
+        recycle = recycle or _patched(namespaces) or threading.active_count() > 1
+        conn.send((exit_code, _read_output(stdout), _read_output(stderr), recycle))
+        if recycle:
+            break
+
+
+class _Worker:
+    def __init__(self, context, work_dir, preload, memory_limit_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, work_dir, preload, memory_limit_mb),
+        )
+        with _main_not_reimported():
+            self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WarmPoolCodeExecutor:
+    """
+    A local code executor backed by a pool of pre-started Python workers.
+
+    Each worker imports `preload` once and then executes Python code blocks
+    in a fresh namespace, which avoids paying interpreter startup and common
+    imports for every block. Workers are killed and replaced on timeout and
+    recycled after `max_runs_per_worker` executions. Non-Python blocks are
+    delegated to AutoGen's LocalCommandLineCodeExecutor. Workers are started
+    by a fork server where available (spawned on Windows), so replacements
+    never inherit the threads of the agents, and they are not daemonic, so
+    code blocks can use multiprocessing themselves. Output written to the
+    file descriptors, e.g. by subprocesses, is captured as well.
+
+    Isolation is weaker than a process per block. After each block the
+    worker restores os.environ, sys.argv, sys.path and the working directory
+    and forgets the pure Python modules the block imported. A block that
+    imported extension modules, changed a preloaded module, `os` or the
+    builtins, or left threads running retires its worker, so the next block
+    gets a fresh one. Anything else a block changes in the process (e.g.
+    the state of the random module) can still be seen by the next block on
+    the same worker.
+
+        executor = WarmPoolCodeExecutor(work_dir="working")
+        user_proxy = UserProxyAgent("user", code_execution_config={"executor": executor})
+    """
+
+    def __init__(
+        self,
+        work_dir="working",
+        pool_size=2,
+        timeout=60,
+        memory_limit_mb=1024,
+        max_runs_per_worker=20,
+        preload=DEFAULT_PRELOAD,
+    ):
+        """
+        :param work_dir: str, the directory code is saved to and executed in.
+        :param pool_size: int, number of warm interpreters.
+        :param timeout: int, seconds a single code block may run.
+        :param memory_limit_mb: int, address space limit per worker (Unix only).
+        :param max_runs_per_worker: int, executions before a worker is replaced.
+        :param preload: list of module names imported when a worker starts.
+        """
+        self._work_dir = Path(work_dir)
+        self._work_dir.mkdir(parents=True, exist_ok=True)
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._memory_limit_mb = memory_limit_mb
+        self._max_runs = max_runs_per_worker
+        self._preload = tuple(preload)
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        self._fallback = LocalCommandLineCodeExecutor(timeout=timeout, work_dir=self._work_dir)
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._start_workers()
+        atexit.register(self.stop)
+
+    @property
+    def code_extractor(self):
+        return MarkdownCodeExtractor()
+
+    @property
+    def work_dir(self):
+        return self._work_dir
+
+    def _new_worker(self):
+        worker = _Worker(self._context, str(self._work_dir), self._preload, self._memory_limit_mb)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _retire(self, worker, kill=False):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.stop(kill=kill)
+
+    def _start_workers(self):
+        for _ in range(self._pool_size):
+            self._idle.put(self._new_worker())
+
+    def _run_python(self, code, filename):
+        worker = self._idle.get()
+        try:
+            worker.conn.send((code, filename))
+            if not worker.conn.poll(self._timeout):
+                self._retire(worker, kill=True)
+                worker = self._new_worker()
+                return TIMEOUT_EXIT_CODE, "Timeout"
+            try:
+                exit_code, stdout, stderr, recycle = worker.conn.recv()
+            except EOFError:
+                # the worker died, most likely by hitting the memory limit
+                self._retire(worker, kill=True)
+                worker = self._new_worker()
+                return 1, "The Python worker crashed (memory limit exceeded?)"
+            worker.runs += 1
+            if recycle or worker.runs >= self._max_runs:
+                self._retire(worker)
+                worker = self._new_worker()
+            return exit_code, stderr + stdout
+        finally:
+            self._idle.put(worker)
+
+    def _save_code(self, code):
+        """Write the block to the file named in its first line, like AutoGen does."""
+        filename = code_filename(code)
+        if filename is None:
+            return None
+        path = (self._work_dir / filename).resolve()
+        if self._work_dir.resolve() not in path.parents:
+            raise ValueError("Filename is not in the workspace")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code, encoding="utf-8")
+        return path
+
+    def execute_code_blocks(self, code_blocks):
+        logs_all = ""
+        exit_code = 0
+        code_file = None
+        for code_block in code_blocks:
+            if code_block.language.lower() not in PYTHON_VARIANTS:
+                result = self._fallback.execute_code_blocks([code_block])
+                logs_all += result.output
+                exit_code = result.exit_code
+                code_file = result.code_file or code_file
+            else:
+                try:
+                    path = self._save_code(code_block.code)
+                except ValueError as err:
+                    return CommandLineCodeResult(exit_code=1, output=str(err))
+                if path is not None:
+                    code_file = str(path)
+                exit_code, output = self._run_python(code_block.code, str(path) if path else None)
+                logs_all += output
+            if exit_code != 0:
+                break
+        return CommandLineCodeResult(exit_code=exit_code, output=logs_all, code_file=code_file)
+
+    def restart(self):
+        self.stop()
+        self._start_workers()
+
+    def stop(self):
+        """Stop all pooled workers."""
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
@@ -13,6 +13,8 @@ from plugins.Movies.tmdb import TMDbService
 from plugins.SimpleFavorites.simple_favorites import SimpleFavoriteService
 
 selected_service = "OpenAI"
+# "csv" keeps favorites in favorite_movies_simple.csv, "sqlite" in favorite_movies.db for large lists
+favorites_backend = "csv"
 kernel = sk.Kernel()
 
 service_id = None
@@ -49,7 +51,7 @@ elif selected_service == "AzureOpenAI":
 
 # Add TMDB service and Favorites service
 tmdb_service = kernel.add_plugin(TMDbService(), "TMDBService")
-favorite_service = kernel.add_plugin(SimpleFavoriteService(), "FavoriteService")
+favorite_service = kernel.add_plugin(SimpleFavoriteService(backend=favorites_backend), "FavoriteService")
 
 # Import FunctionChoiceBehavior for auto function calling
 from semantic_kernel.connectors.ai.function_choice_behavior import FunctionChoiceBehavior
@@ -0,0 +1,165 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import namedtuple
+
+# Seconds a response stays fresh when TMDb does not send a max-age,
+# matched by path prefix (first match wins).
+ENDPOINT_TTLS = [
+    ("/genre/", 7 * 24 * 60 * 60),
+    ("/configuration", 7 * 24 * 60 * 60),
+    ("/movie/now_playing", 6 * 60 * 60),
+    ("/tv/top_rated", 12 * 60 * 60),
+    ("/discover/", 6 * 60 * 60),
+]
+DEFAULT_TTL = 60 * 60
+# how long past freshness an entry may still be served while it is revalidated
+STALE_TTL = 7 * 24 * 60 * 60
+
+CachedResponse = namedtuple(
+    "CachedResponse", ["body", "etag", "last_modified", "fetched_at", "max_age", "stale_ttl"]
+)
+
+
+def cache_key(path, params):
+    """The cache key of a request, without the API key."""
+    query = sorted((k, str(v)) for k, v in params.items() if k != "api_key")
+    return path + "?" + "&".join(f"{k}={v}" for k, v in query)
+
+
+def parse_cache_control(value):
+    """Cache-Control directives as a dict, e.g. {"max-age": "3600", "public": None}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class ResponseCache:
+    """
+    An on-disk cache of TMDb JSON responses.
+
+    How long a response is fresh comes from its Cache-Control max-age, or
+    from `endpoint_ttls` when there is none. After that it is stale: it can
+    still be served for `stale_ttl` seconds (or the stale-while-revalidate
+    time TMDb sends) while a conditional request with its ETag or
+    Last-Modified checks it in the background. `no-store` responses are not
+    cached and `no-cache` ones are revalidated on every use.
+    """
+
+    def __init__(
+        self,
+        path=".cache/tmdb_responses.db",
+        endpoint_ttls=ENDPOINT_TTLS,
+        default_ttl=DEFAULT_TTL,
+        stale_ttl=STALE_TTL,
+    ):
+        """
+        :param path: str, the SQLite file used to store the responses.
+        :param endpoint_ttls: list of (path prefix, seconds) used without a max-age.
+        :param default_ttl: int, seconds for paths not in `endpoint_ttls`.
+        :param stale_ttl: int, seconds a stale entry may be served while revalidating.
+        """
+        self.path = path
+        self.endpoint_ttls = list(endpoint_ttls)
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    max_age REAL NOT NULL,
+                    stale_ttl REAL NOT NULL
+                )"""
+            )
+        return self._conn
+
+    def _freshness(self, path, headers):
+        """(max age, stale ttl) for a response, or None when it must not be stored."""
+        directives = parse_cache_control(headers.get("cache-control"))
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            max_age = 0
+        elif re.fullmatch(r"\d+", directives.get("s-maxage") or directives.get("max-age") or ""):
+            max_age = int(directives.get("s-maxage") or directives["max-age"])
+        else:
+            max_age = next(
+                (ttl for prefix, ttl in self.endpoint_ttls if path.startswith(prefix)),
+                self.default_ttl,
+            )
+        stale_ttl = directives.get("stale-while-revalidate")
+        stale_ttl = int(stale_ttl) if stale_ttl and stale_ttl.isdigit() else self.stale_ttl
+        return max_age, stale_ttl
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT body, etag, last_modified, fetched_at, max_age, stale_ttl "
+            "FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def state(self, entry):
+        """Whether an entry is fresh, stale (serve and revalidate) or expired (fetch first)."""
+        age = time.time() - entry.fetched_at
+        if age < entry.max_age:
+            return "fresh"
+        if age < entry.max_age + entry.stale_ttl:
+            return "stale"
+        return "expired"
+
+    def store(self, key, path, response):
+        """Saves a 200 response, returns its decoded JSON."""
+        data = response.json()
+        freshness = self._freshness(path, response.headers)
+        if freshness is None:
+            self.delete(key)
+            return data
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(data),
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    time.time(),
+                    *freshness,
+                ),
+            )
+        return data
+
+    def revalidated(self, key, path, response):
+        """Marks an entry fresh again after a 304 Not Modified."""
+        freshness = self._freshness(path, response.headers)
+        if freshness is None:
+            self.delete(key)
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE responses SET fetched_at = ?, max_age = ?, stale_ttl = ?, "
+                "etag = COALESCE(?, etag) WHERE key = ?",
+                (time.time(), *freshness, response.headers.get("etag"), key),
+            )
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import weakref
+
+from .tmdb_http import get_json
+
+GENRE_TTL = 24 * 60 * 60
+# once this share of the TTL has passed, the next lookup refreshes in the background
+REFRESH_AHEAD = 0.8
+
+
+class GenreMap:
+    """
+    The TMDb genre list of one kind ("movie" or "tv"), kept for the whole
+    process and refreshed when it gets old.
+
+    Lookups by name are a dict access on the case-folded name; names that
+    are not an exact match fall back to the old substring search, so
+    "sci-fi" still finds "Science Fiction & Fantasy" style names.
+    """
+
+    def __init__(self, kind, ttl=GENRE_TTL):
+        self.kind = kind
+        self.ttl = ttl
+        self.genres = []
+        self.fetched_at = 0.0
+        self._by_name = {}
+        # one fetch at a time per event loop, shared by concurrent callers
+        self._fetches = weakref.WeakKeyDictionary()
+        self._background = set()
+
+    async def _fetch(self, api_key):
+        data = await get_json(f"/genre/{self.kind}/list", api_key=api_key, language="en-US")
+        if data is not None:
+            self.genres = data["genres"]
+            self._by_name = {genre["name"].casefold(): str(genre["id"]) for genre in self.genres}
+            self.fetched_at = time.monotonic()
+
+    def _start_fetch(self, api_key):
+        loop = asyncio.get_running_loop()
+        task = self._fetches.get(loop)
+        if task is None or task.done():
+            task = loop.create_task(self._fetch(api_key))
+            self._fetches[loop] = task
+        return task
+
+    async def load(self, api_key):
+        """Makes sure the genre list is loaded and fresh enough, returns self."""
+        age = time.monotonic() - self.fetched_at
+        if not self.genres or age >= self.ttl:
+            await self._start_fetch(api_key)
+        elif age >= self.ttl * REFRESH_AHEAD:
+            # serve the current list now, refresh it for the next caller
+            task = self._start_fetch(api_key)
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        return self
+
+    def genre_id(self, genre_name):
+        """The ID of a genre as a string, or None if the genre is not found."""
+        genre_id = self._by_name.get(genre_name.strip().casefold())
+        if genre_id is not None:
+            return genre_id
+        for genre in self.genres:
+            if genre_name.lower() in genre["name"].lower():
+                return str(genre["id"])
+        return None
+
+    def names(self):
+        return ", ".join(genre["name"] for genre in self.genres)
+
+
+movie_genres = GenreMap("movie")
+tv_genres = GenreMap("tv")
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import math
+import weakref
+from datetime import date, timedelta
+
+import httpx
+
+from .tmdb_cache import ResponseCache, cache_key
+
+try:
+    import h2  # noqa: F401  HTTP/2 support comes with httpx[http2]
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+BASE_URL = "https://api.themoviedb.org/3"
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+PAGE_SIZE = 20  # results per TMDb list page
+MAX_PAGES = 5
+
+# Responses are kept on disk and shared by every process using the same path
+response_cache = ResponseCache()
+
+# An AsyncClient belongs to the event loop it was created on, so there is one
+# client per running loop, shared by every TMDb function on that loop.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """The pooled TMDb client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            http2=HTTP2,
+            timeout=TIMEOUT,
+            limits=LIMITS,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def get_json(path, use_cache=True, **params):
+    """
+    GETs a TMDb endpoint on the shared client.
+
+    Cached responses are returned without a request while they are fresh.
+    Stale ones are returned right away too, and revalidated in the
+    background for the next call. `no-cache` responses (max age 0) are
+    revalidated with a conditional request before they are returned.
+
+    :param path: str, the endpoint path, e.g. "/genre/movie/list".
+    :param use_cache: bool, read and write the on-disk response cache.
+    :return: dict, the decoded JSON body, or None when the request failed.
+    """
+    if not use_cache:
+        return await _fetch(path, params)
+
+    key = cache_key(path, params)
+    entry = response_cache.get(key)
+    if entry is not None:
+        state = response_cache.state(entry)
+        if state == "stale" and entry.max_age == 0:
+            return await _fetch(path, params, key, entry)
+        if state == "stale":
+            _revalidate_in_background(path, params, key, entry)
+        if state != "expired":
+            return json.loads(entry.body)
+    return await _fetch(path, params, key, entry)
+
+
+async def _fetch(path, params, key=None, entry=None):
+    headers = {}
+    if entry is not None:
+        # conditional request, TMDb answers 304 when the entry is still valid
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    stale = json.loads(entry.body) if entry is not None else None
+
+    try:
+        response = await get_client().get(path, params=params, headers=headers)
+    except httpx.HTTPError:
+        return stale
+    if response.status_code == 304 and entry is not None:
+        response_cache.revalidated(key, path, response)
+        return stale
+    if response.status_code != 200:
+        # keep serving what we have while TMDb is throttling or failing
+        return stale if response.status_code == 429 or response.status_code >= 500 else None
+    if key is None:
+        return response.json()
+    return response_cache.store(key, path, response)
+
+
+# key -> running revalidation, also keeps the task from being garbage collected
+_revalidating = {}
+
+
+def _revalidate_in_background(path, params, key, entry):
+    if key in _revalidating:
+        return
+    task = asyncio.get_running_loop().create_task(_fetch(path, params, key, entry))
+    _revalidating[key] = task
+    task.add_done_callback(lambda _: _revalidating.pop(key, None))
+
+
+async def discover(kind, count=10, max_pages=MAX_PAGES, **params):
+    """
+    Yields up to `count` results of the /discover/{kind} endpoint.
+
+    The pages needed for `count` are requested at the same time, results
+    are yielded in page order as soon as their page is in, and the pages
+    still loading are cancelled once `count` results were yielded.
+
+    :param kind: str, "movie" or "tv".
+    :param count: int, the number of results wanted.
+    :param max_pages: int, the most pages requested.
+    """
+    pages = max(1, min(max_pages, math.ceil(count / PAGE_SIZE)))
+    tasks = [
+        asyncio.ensure_future(get_json(f"/discover/{kind}", page=page, **params))
+        for page in range(1, pages + 1)
+    ]
+    seen = set()
+    try:
+        for task in tasks:
+            data = await task
+            if data is None:
+                continue
+            for item in data["results"]:
+                # a result can move to the next page while the pages load
+                if item["id"] in seen:
+                    continue
+                seen.add(item["id"])
+                yield item
+                if len(seen) >= count:
+                    return
+            if data.get("page", 0) >= data.get("total_pages", 0):
+                return
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def now_playing_filter(genre_id, days=42):
+    """Discover parameters for movies of a genre in theaters now, like /movie/now_playing."""
+    today = date.today()
+    return {
+        "with_genres": genre_id,
+        "with_release_type": "2|3",  # theatrical (limited)
+        "release_date.gte": (today - timedelta(days=days)).isoformat(),
+        "release_date.lte": today.isoformat(),
+        "sort_by": "popularity.desc",
+    }
+
+
+def top_rated_filter(genre_id, min_votes=200):
+    """Discover parameters for the best rated TV shows of a genre, like /tv/top_rated."""
+    return {
+        "with_genres": genre_id,
+        "sort_by": "vote_average.desc",
+        "vote_count.gte": min_votes,
+    }
+
+
+async def close_client():
+    """Closes the client of the running event loop, e.g. before the loop ends."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
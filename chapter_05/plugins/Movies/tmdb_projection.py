@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import logging
+from collections import namedtuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+Projection = namedtuple("Projection", ["fields", "max_items", "max_text", "format"])
+
+# What each kernel function returns to the LLM; edit to trade detail for tokens.
+# format is "csv" (a header line, then one line per item) or "json".
+PROJECTIONS = {
+    "get_top_movies_by_genre": Projection(
+        fields=("id", "title", "release_date", "vote_average", "overview"),
+        max_items=10,
+        max_text=160,
+        format="csv",
+    ),
+    "get_top_tv_shows_by_genre": Projection(
+        fields=("id", "name", "first_air_date", "vote_average", "overview"),
+        max_items=10,
+        max_text=160,
+        format="csv",
+    ),
+}
+
+
+_encoding = None
+
+
+def count_tokens(text):
+    """Tokens in text for the GPT-4 tokenizer, or an estimate without tiktoken."""
+    global _encoding, tiktoken
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # the encoding could not be downloaded
+            tiktoken = None
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def report_tokens(function_name, output, items):
+    """Logs the tokens a tool output costs, next to the cost of the full TMDb items."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%s returned %d items in %d tokens (%d as full JSON)",
+            function_name,
+            len(items),
+            count_tokens(output),
+            count_tokens(json.dumps(items)),
+        )
+
+
+def _value(value, max_text):
+    if isinstance(value, float):
+        return round(value, 1)
+    if isinstance(value, str) and max_text and len(value) > max_text:
+        return value[: max_text - 1].rstrip() + "…"
+    if isinstance(value, (list, tuple)):
+        return "|".join(str(v) for v in value)
+    return value
+
+
+def item_limit(function_name, count):
+    """
+    The number of items worth fetching for a kernel function: what was asked
+    for, capped at the projection's max_items, which project() keeps anyway.
+
+    :param function_name: str, a key of PROJECTIONS.
+    :param count: int, the number of items asked for.
+    """
+    return min(count, PROJECTIONS[function_name].max_items)
+
+
+def project(function_name, items):
+    """
+    Formats a kernel function's TMDb results with its projection and logs
+    how many tokens the tool output costs.
+
+    :param function_name: str, a key of PROJECTIONS.
+    :param items: list of dict, the TMDb results.
+    :return: str, the compact tool output.
+    """
+    projection = PROJECTIONS[function_name]
+    rows = [
+        {field: _value(item.get(field), projection.max_text) for field in projection.fields}
+        for item in items[: projection.max_items]
+    ]
+    if projection.format == "json":
+        output = json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+    else:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(projection.fields)
+        writer.writerows([row[field] for field in projection.fields] for row in rows)
+        output = buffer.getvalue() if rows else ""
+
+    report_tokens(function_name, output, items[: projection.max_items])
+    return output
@@ -0,0 +1,371 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows, writers are not locked
+    fcntl = None
+
+FIELDNAMES = ['id', 'title', 'genre', 'added_date']
+
+
+class FavoritesIndex:
+    """In-memory indexes over a list of favorite rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_id = {}
+        self.by_title = {}
+        self.by_genre = {}
+        self.next_id = 1
+        for row in rows:
+            self._index(row)
+
+    def _index(self, row):
+        try:
+            movie_id = int(row.get('id', 0))
+        except ValueError:
+            movie_id = None
+        if movie_id is not None:
+            self.by_id[movie_id] = row
+            self.next_id = max(self.next_id, movie_id + 1)
+        self.by_title.setdefault(row['title'].lower(), row)
+        self.by_genre.setdefault(row['genre'].lower(), []).append(row)
+
+    def add(self, row):
+        self.rows.append(row)
+        self._index(row)
+
+    def genre_rows(self, genre):
+        """Rows whose genre contains `genre`, only the distinct genres are scanned"""
+        genre = genre.lower()
+        matches = [rows for name, rows in self.by_genre.items() if genre in name]
+        if len(matches) == 1:
+            return list(matches[0])
+        ids = {id(row) for rows in matches for row in rows}
+        return [row for row in self.rows if id(row) in ids]
+
+
+class CsvFavoritesStore:
+    """
+    Favorites in a CSV file, the original format.
+
+    The parsed file is kept as a FavoritesIndex, so lookups are dict
+    accesses. The snapshot is reused while the file's mtime, size and inode
+    are unchanged, and writes update it along with the file, so reads only
+    parse the CSV again after another process changed it.
+
+    Several sessions can share the file. Writers take an advisory lock on
+    `<csv_file>.lock` and re-read the file under it, so no change is lost.
+    The new contents are written to a temporary file that replaces the CSV
+    with an atomic rename, so readers never see a partial file and do not
+    need the lock. Each change is first recorded in `<csv_file>.journal`;
+    a journal left by a writer that died before the rename is replayed
+    under the lock when the store is opened and before every write.
+
+    The highest ID handed out is kept in `<csv_file>.seq`, so IDs of
+    deleted favorites are never reused.
+    """
+
+    def __init__(self, csv_file='favorite_movies_simple.csv'):
+        self.csv_file = csv_file
+        self.lock_file = csv_file + '.lock'
+        self.journal_file = csv_file + '.journal'
+        self.sequence_file = csv_file + '.seq'
+        self._snapshot = None  # (stat key, FavoritesIndex)
+        with self._locked():
+            self._initialize_csv()
+            self._replay_journal()
+
+    def _initialize_csv(self):
+        """Initialize CSV file with headers if it doesn't exist"""
+        if not os.path.exists(self.csv_file):
+            self._save([])
+
+    @contextmanager
+    def _locked(self):
+        """Holds the writers' lock, shared with other processes"""
+        with open(self.lock_file, 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _stat_key(self):
+        try:
+            stat = os.stat(self.csv_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _load(self):
+        """The favorites index, parsed again only when the CSV changed"""
+        key = self._stat_key()
+        snapshot = self._snapshot
+        if snapshot is not None and key is not None and snapshot[0] == key:
+            return snapshot[1]
+        rows = []
+        try:
+            with open(self.csv_file, 'r', newline='', encoding='utf-8') as file:
+                rows = list(csv.DictReader(file))
+        except FileNotFoundError:
+            pass
+        index = FavoritesIndex(rows)
+        # the file may have been replaced while it was read, check again on the next load
+        self._snapshot = (key, index) if key == self._stat_key() else None
+        return index
+
+    def _save(self, rows):
+        """Save all favorites to a temporary file and rename it over the CSV"""
+        directory = os.path.dirname(os.path.abspath(self.csv_file))
+        fd, temp_file = tempfile.mkstemp(prefix='.favorites-', suffix='.csv', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+                writer.writeheader()
+                writer.writerows(rows)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, self.csv_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
+
+    def _next_id(self, index):
+        """The next unused ID, including the IDs of deleted favorites"""
+        try:
+            with open(self.sequence_file, 'r', encoding='utf-8') as file:
+                stored = int(file.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            stored = 0
+        return max(index.next_id, stored)
+
+    def _store_next_id(self, next_id):
+        temp_file = self.sequence_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            file.write(str(next_id))
+        os.replace(temp_file, self.sequence_file)
+
+    def _apply(self, index, change):
+        """Applies a journaled change to the index, changes already applied are skipped"""
+        if change['op'] == 'add':
+            row = change['row']
+            if int(row['id']) not in index.by_id and row['title'].lower() not in index.by_title:
+                index.add(row)
+        elif change['op'] == 'delete':
+            row = index.by_id.pop(change['id'], None)
+            if row is not None:
+                index = FavoritesIndex([r for r in index.rows if r is not row])
+        return index
+
+    def _write(self, index, change):
+        """Journals a change, saves it to the CSV, then clears the journal"""
+        with open(self.journal_file, 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps(change) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        next_id = self._next_id(index)
+        try:
+            index = self._apply(index, change)
+            self._save(index.rows)
+        except BaseException:
+            self._snapshot = None  # the cached index may hold the unsaved change
+            raise
+        self._snapshot = (self._stat_key(), index)
+        self._store_next_id(max(next_id, index.next_id))
+        os.remove(self.journal_file)
+        return index
+
+    def _replay_journal(self):
+        """Finishes the changes of a writer that stopped before saving"""
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as journal:
+                lines = journal.read().splitlines()
+        except FileNotFoundError:
+            return
+        index = self._load()
+        next_id = self._next_id(index)
+        for line in lines:
+            try:
+                change = json.loads(line)
+            except ValueError:  # the last change was cut off before it was saved
+                continue
+            index = self._apply(index, change)
+        self._save(index.rows)
+        self._snapshot = (self._stat_key(), index)
+        self._store_next_id(max(next_id, index.next_id))
+        os.remove(self.journal_file)
+
+    def add(self, title, genre, added_date):
+        """Add a favorite with the next ID, None if the title is already a favorite"""
+        with self._locked():
+            self._replay_journal()
+            index = self._load()
+            if title.lower() in index.by_title:
+                return None
+            row = {'id': str(self._next_id(index)), 'title': title, 'genre': genre, 'added_date': added_date}
+            self._write(index, {'op': 'add', 'row': row})
+        return row
+
+    def get(self, movie_id):
+        return self._load().by_id.get(movie_id)
+
+    def find_by_title(self, title):
+        return self._load().by_title.get(title.lower())
+
+    def all(self):
+        return list(self._load().rows)
+
+    def by_genre(self, genre):
+        return self._load().genre_rows(genre)
+
+    def count(self):
+        return len(self._load().rows)
+
+    def delete(self, movie_id):
+        with self._locked():
+            self._replay_journal()
+            index = self._load()
+            if movie_id not in index.by_id:
+                return False
+            self._write(index, {'op': 'delete', 'id': movie_id})
+        return True
+
+
+class SqliteFavoritesStore:
+    """
+    Favorites in a SQLite database, for large lists.
+
+    Titles are indexed by their lowercase form and genres live in their own
+    table, so lookups by ID, title or genre use an index instead of reading
+    every favorite. IDs come from an AUTOINCREMENT sequence and are never
+    reused, even after the newest favorite is deleted. Triggers keep the
+    number of favorites in a one row table, so count() does not scan them.
+    """
+
+    def __init__(self, db_file='favorite_movies.db'):
+        self.db_file = db_file
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS genres (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS favorites (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    title_lower TEXT NOT NULL UNIQUE,
+                    genre TEXT NOT NULL,
+                    genre_id INTEGER NOT NULL REFERENCES genres (id),
+                    added_date TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS favorites_genre ON favorites (genre_id);
+                CREATE TABLE IF NOT EXISTS favorites_count (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total INTEGER NOT NULL
+                );
+                CREATE TRIGGER IF NOT EXISTS favorites_counted_insert AFTER INSERT ON favorites
+                BEGIN
+                    UPDATE favorites_count SET total = total + 1 WHERE id = 1;
+                END;
+                CREATE TRIGGER IF NOT EXISTS favorites_counted_delete AFTER DELETE ON favorites
+                BEGIN
+                    UPDATE favorites_count SET total = total - 1 WHERE id = 1;
+                END;
+                """
+            )
+            if self._conn.execute('SELECT 1 FROM favorites_count').fetchone() is None:
+                # a database created before the counter, counted once
+                self._conn.execute(
+                    'INSERT INTO favorites_count (id, total) SELECT 1, COUNT(*) FROM favorites'
+                )
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        return {
+            'id': str(row['id']),
+            'title': row['title'],
+            'genre': row['genre'],
+            'added_date': row['added_date'],
+        }
+
+    def add(self, title, genre, added_date):
+        """Add a favorite with the next ID, None if the title is already a favorite"""
+        try:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO genres (name) VALUES (?)', (genre.lower(),)
+                )
+                cursor = self._conn.execute(
+                    """
+                    INSERT INTO favorites (title, title_lower, genre, genre_id, added_date)
+                    SELECT ?, ?, ?, id, ? FROM genres WHERE name = ?
+                    """,
+                    (title, title.lower(), genre, added_date, genre.lower()),
+                )
+        except sqlite3.IntegrityError:
+            return None
+        return {'id': str(cursor.lastrowid), 'title': title, 'genre': genre, 'added_date': added_date}
+
+    def get(self, movie_id):
+        return self._row(
+            self._conn.execute('SELECT * FROM favorites WHERE id = ?', (movie_id,)).fetchone()
+        )
+
+    def find_by_title(self, title):
+        return self._row(
+            self._conn.execute(
+                'SELECT * FROM favorites WHERE title_lower = ?', (title.lower(),)
+            ).fetchone()
+        )
+
+    def all(self):
+        return [self._row(row) for row in self._conn.execute('SELECT * FROM favorites ORDER BY id')]
+
+    def by_genre(self, genre):
+        # substring match over the few distinct genres, then the genre index
+        rows = self._conn.execute(
+            """
+            SELECT favorites.* FROM genres
+            JOIN favorites ON favorites.genre_id = genres.id
+            WHERE instr(genres.name, ?) > 0
+            ORDER BY favorites.id
+            """,
+            (genre.lower(),),
+        )
+        return [self._row(row) for row in rows]
+
+    def count(self):
+        return self._conn.execute('SELECT total FROM favorites_count WHERE id = 1').fetchone()[0]
+
+    def delete(self, movie_id):
+        with self._conn:
+            cursor = self._conn.execute('DELETE FROM favorites WHERE id = ?', (movie_id,))
+        return cursor.rowcount > 0
+
+
+def open_store(backend='csv', path=None):
+    """
+    Opens a favorites store.
+
+    :param backend: str, 'csv' (the default, favorite_movies_simple.csv) or
+        'sqlite' (favorite_movies.db, for large lists).
+    :param path: str, a different file for the backend.
+    """
+    if backend == 'csv':
+        return CsvFavoritesStore(path or 'favorite_movies_simple.csv')
+    if backend == 'sqlite':
+        return SqliteFavoritesStore(path or 'favorite_movies.db')
+    raise ValueError(f"backend must be 'csv' or 'sqlite', got {backend!r}")
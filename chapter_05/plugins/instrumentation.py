@@ -0,0 +1,179 @@
+import atexit
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Set PLUGIN_TRACING=1 to record every traced kernel function call, and
+# PLUGIN_TRACING_FILE to a path to have the histograms written there as JSON
+# when the process exits. The variables are read when the plugins are
+# imported; with tracing off the functions are left undecorated.
+ENABLED = os.getenv("PLUGIN_TRACING", "").lower() not in ("", "0", "false", "no", "off")
+EXPORT_FILE = os.getenv("PLUGIN_TRACING_FILE")
+
+
+class Histogram:
+    """Counts values in power-of-two buckets, the first bucket holds everything up to 1."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = {}  # bucket upper bound -> count
+
+    def record(self, value):
+        bound = 2 ** math.ceil(math.log2(value)) if value > 1 else 1
+        self.buckets[bound] = self.buckets.get(bound, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, capped at the maximum."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bound in sorted(self.buckets):
+            seen += self.buckets[bound]
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {str(bound): n for bound, n in sorted(self.buckets.items())},
+        }
+
+
+class FunctionStats:
+    """Histograms of one function's duration (ms), argument size and result size (chars)."""
+
+    def __init__(self):
+        self.duration_ms = Histogram()
+        self.argument_chars = Histogram()
+        self.result_chars = Histogram()
+        self.errors = 0
+
+    def to_dict(self):
+        return {
+            "errors": self.errors,
+            "duration_ms": self.duration_ms.to_dict(),
+            "argument_chars": self.argument_chars.to_dict(),
+            "result_chars": self.result_chars.to_dict(),
+        }
+
+
+_stats = {}
+_lock = threading.Lock()
+
+
+def _size(value):
+    if value is None:
+        return 0
+    return len(value) if isinstance(value, str) else len(repr(value))
+
+
+def _record(name, started, arguments, result, failed):
+    duration = (time.perf_counter() - started) * 1000
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = FunctionStats()
+        stats.duration_ms.record(duration)
+        stats.argument_chars.record(sum(_size(value) for value in arguments))
+        if failed:
+            stats.errors += 1
+        else:
+            stats.result_chars.record(_size(result))
+    logger.debug("%s took %.1f ms", name, duration)
+
+
+def traced(func):
+    """
+    Records the duration, argument size and result size of each call of a
+    kernel function. Put it below @kernel_function. Coroutine functions get
+    an async wrapper, so Semantic Kernel still awaits them.
+
+    With tracing disabled the function is returned as it is.
+    """
+    if not ENABLED:
+        return func
+    name = func.__qualname__
+
+    def arguments(args, kwargs):
+        # leave out self
+        return list(args[1:]) + list(kwargs.values())
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException:
+                _record(name, started, arguments(args, kwargs), None, True)
+                raise
+            _record(name, started, arguments(args, kwargs), result, False)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            _record(name, started, arguments(args, kwargs), None, True)
+            raise
+        _record(name, started, arguments(args, kwargs), result, False)
+        return result
+
+    return wrapper
+
+
+def snapshot():
+    """The recorded histograms, keyed by function name, as plain dicts."""
+    with _lock:
+        return {name: stats.to_dict() for name, stats in sorted(_stats.items())}
+
+
+def export_json(path=None):
+    """
+    Writes the recorded histograms as JSON.
+
+    :param path: str, the output file, PLUGIN_TRACING_FILE by default.
+    :return: str, the JSON document.
+    """
+    document = json.dumps({"functions": snapshot()}, indent=2)
+    path = path or EXPORT_FILE
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(document)
+    return document
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+if ENABLED and EXPORT_FILE:
+    atexit.register(export_json)
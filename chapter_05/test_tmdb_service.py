@@ -1,5 +1,8 @@
+import logging
+
 import semantic_kernel as sk
 
+from plugins import instrumentation
 from plugins.Movies.tmdb import TMDbService
 
 
@@ -39,4 +42,12 @@ async def main():
 if __name__ == "__main__":
     import asyncio
 
+    # report how many tokens each TMDb tool output costs
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("plugins.Movies.tmdb_projection").setLevel(logging.INFO)
+
     asyncio.run(main())
+
+    # timings and sizes of the calls, run with PLUGIN_TRACING=1 to record them
+    if instrumentation.ENABLED:
+        print(instrumentation.export_json())